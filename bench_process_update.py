@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark for OnkyoMediaPlayer.process_update.
+
+Feeds a mix of messages, as seen during NET/USB playback, through the main
+zone entity and reports messages per second. State writes are stubbed out
+and counted, so this measures the integration's own per-message work.
+
+With --compare, the same benchmark is first run against the integration as
+of the given git revisions (e.g. the commit before a change), for a
+before/after on the same machine.
+
+Usage: python bench_process_update.py [messages] [repeats] [--compare REV]...
+"""
+
+import argparse
+import asyncio
+from pathlib import Path
+import subprocess
+import sys
+import tempfile
+import time
+from types import SimpleNamespace
+
+from custom_components.onkyo_ng.const import InputSource, ListeningMode
+from custom_components.onkyo_ng.media_player import OnkyoMediaPlayer
+
+MESSAGES = [
+    ("main", "net-usb-title-name", "Song Title"),
+    ("main", "net-usb-artist-name", "Artist"),
+    ("main", "net-usb-time-info", "00:42/03:30"),
+    ("main", "net-usb-play-status", "P--"),
+    ("main", "fl-display-information", "4E4554"),
+    ("main", "master-volume", 42),
+    ("main", "audio-muting", "off"),
+    ("main", "audio-information", ("HDMI 1", "PCM", "48 kHz", "2.0 ch", "Stereo", "2.0 ch", "48 kHz", "", "", "")),
+    ("main", "video-information", ("HDMI 1", "1920 x 1080p 60 Hz", "RGB", "24bit", "HDMI", "1920 x 1080p 60 Hz", "RGB", "24bit", "")),
+    ("main", "input-selector", ("video2", "cbl", "sat")),
+    ("main", "listening-mode", "stereo"),
+    ("main", "net-usb-time-info", "00:43/03:30"),
+]
+
+
+def make_entity() -> OnkyoMediaPlayer:
+    receiver = SimpleNamespace(
+        model_name="TX-NR609",
+        identifier="0009B0000000",
+        host="192.0.2.1",
+        query_property=lambda zone, prop: None,
+        # Revisions before the command scheduler queried through the connection.
+        conn=SimpleNamespace(query_property=lambda zone, prop: None),
+    )
+    entity = OnkyoMediaPlayer(
+        receiver,
+        "main",
+        volume_resolution=80,
+        max_volume=100,
+        sources={InputSource.CBL: "Cable"},
+        modes={ListeningMode.STEREO: "Stereo"},
+    )
+    entity.hass = SimpleNamespace(loop=asyncio.new_event_loop())
+    entity.entity_id = "media_player.bench"
+    entity.writes = 0
+
+    def async_write_ha_state() -> None:
+        entity.writes += 1
+
+    entity.async_write_ha_state = async_write_ha_state
+    return entity
+
+
+def run(count: int, repeats: int) -> None:
+    entity = make_entity()
+    messages = (MESSAGES * (count // len(MESSAGES) + 1))[:count]
+    process_update = entity.process_update
+
+    best = float("inf")
+    for _ in range(repeats):
+        start = time.perf_counter()
+        for message in messages:
+            process_update(message)
+        best = min(best, time.perf_counter() - start)
+
+    print(f"{count} messages, best of {repeats}: {count / best:,.0f} messages/s")
+    print(f"state writes per message: {entity.writes / (count * repeats):.2f}")
+
+
+def run_revision(revision: str, count: int, repeats: int) -> None:
+    """Run this benchmark against the integration as of a git revision."""
+    root = Path(__file__).parent
+    with tempfile.TemporaryDirectory() as tmp:
+        archive = subprocess.run(
+            ["git", "archive", revision, "custom_components"],
+            cwd=root,
+            capture_output=True,
+            check=True,
+        ).stdout
+        subprocess.run(["tar", "-x", "-C", tmp], input=archive, check=True)
+        bench = Path(tmp) / Path(__file__).name
+        bench.write_text(Path(__file__).read_text())
+        subprocess.run([sys.executable, bench, str(count), str(repeats)], check=True)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0].strip())
+    parser.add_argument("messages", nargs="?", type=int, default=500_000)
+    parser.add_argument("repeats", nargs="?", type=int, default=5)
+    parser.add_argument(
+        "--compare",
+        metavar="REV",
+        action="append",
+        default=[],
+        help="also run against this git revision, can be repeated",
+    )
+    args = parser.parse_args()
+
+    for revision in args.compare:
+        print(f"{revision}:")
+        run_revision(revision, args.messages, args.repeats)
+    if args.compare:
+        print("working tree:")
+    run(args.messages, args.repeats)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,27 +1,38 @@
 """The onkyo component."""
 
+from collections.abc import Mapping
 from dataclasses import dataclass
+import logging
 from homeassistant.const import CONF_HOST, Platform
-from homeassistant.core import HomeAssistant
+from homeassistant.core import HomeAssistant, callback
 from homeassistant.exceptions import ConfigEntryNotReady
 from homeassistant.helpers import config_validation as cv
 from homeassistant.helpers.typing import ConfigType
-from typing import TypeAlias, TYPE_CHECKING
+from homeassistant.util import dt as dt_util
+from typing import Any, TypeAlias, TYPE_CHECKING
 
 if TYPE_CHECKING:
     from homeassistant.config_entries import ConfigEntry
 
 from .const import (
+    CONF_RECEIVER_INFO,
+    CONF_RECEIVER_INFO_VALIDATED,
+    DEVICE_INTERVIEW_TIMEOUT,
     DOMAIN,
+    OPTION_HEARTBEAT_INTERVAL,
+    OPTION_HEARTBEAT_INTERVAL_DEFAULT,
     OPTION_INPUT_SOURCES,
     OPTION_LISTENING_MODES,
+    RECEIVER_INFO_REVALIDATE_INTERVAL,
     InputSource,
     ListeningMode,
 )
-from .receiver import Receiver, async_interview
+from .receiver import Receiver, ReceiverInfo, async_interview_receiver
 from .services import DATA_MP_ENTITIES, async_register_services
 
-PLATFORMS = [Platform.MEDIA_PLAYER]
+_LOGGER = logging.getLogger(__name__)
+
+PLATFORMS = [Platform.MEDIA_PLAYER, Platform.SENSOR]
 
 CONFIG_SCHEMA = cv.config_entry_only_config_schema(DOMAIN)
 
@@ -33,6 +44,7 @@ class OnkyoData:
     receiver: Receiver
     sources: dict[InputSource, str]
     modes: dict[ListeningMode, str]
+    options: Mapping[str, Any]
 
 
 if TYPE_CHECKING:
@@ -50,15 +62,19 @@ async def async_setup(hass: HomeAssistant, _: ConfigType) -> bool:
 
 async def async_setup_entry(hass: HomeAssistant, entry: OnkyoConfigEntry) -> bool:
     """Set up the Onkyo config entry."""
-    entry.async_on_unload(entry.add_update_listener(update_listener))
-
     host = entry.data[CONF_HOST]
 
-    info = await async_interview(host)
+    info = _cached_receiver_info(entry)
     if info is None:
-        raise ConfigEntryNotReady(f"Unable to connect to: {host}")
-
-    receiver = await Receiver.async_create(info)
+        # The interview connection is kept open and becomes the live connection.
+        # Without it nothing is known about the receiver, not even which
+        # entities it has, so setup has to wait until it can be reached.
+        receiver = await async_interview_receiver(host)
+        if receiver is None:
+            raise ConfigEntryNotReady(f"Unable to connect to: {host}")
+        _async_store_receiver_info(hass, entry, receiver.info)
+    else:
+        receiver = await Receiver.async_create(info)
 
     sources_store: dict[str, str] = entry.options[OPTION_INPUT_SOURCES]
     sources = {InputSource(k): v for k, v in sources_store.items()}
@@ -66,15 +82,78 @@ async def async_setup_entry(hass: HomeAssistant, entry: OnkyoConfigEntry) -> boo
     modes_store: dict[str, str] = entry.options[OPTION_LISTENING_MODES]
     modes = {ListeningMode(k): v for k, v in modes_store.items()}
 
-    entry.runtime_data = OnkyoData(receiver, sources, modes)
+    receiver.heartbeat_interval = entry.options.get(
+        OPTION_HEARTBEAT_INTERVAL, OPTION_HEARTBEAT_INTERVAL_DEFAULT
+    )
+
+    entry.runtime_data = OnkyoData(receiver, sources, modes, entry.options)
+    entry.async_on_unload(entry.add_update_listener(update_listener))
 
+    # Entities are set up before connecting, so that with cached information
+    # they show their last state even while the receiver cannot be reached.
     await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
 
-    await receiver.conn.connect()
+    if not receiver.connected and not await receiver.async_connect(
+        DEVICE_INTERVIEW_TIMEOUT
+    ):
+        _LOGGER.warning("Unable to connect to %s, retrying in the background", host)
+    validated: float = entry.data.get(CONF_RECEIVER_INFO_VALIDATED, 0)
+    if dt_util.utcnow().timestamp() - validated > RECEIVER_INFO_REVALIDATE_INTERVAL:
+
+        @callback
+        def refresh_on_connect(receiver: Receiver) -> None:
+            # The refresh needs the connection, so wait until it is up.
+            receiver.callbacks.connect.remove(refresh_on_connect)
+            entry.async_create_background_task(
+                hass,
+                _async_refresh_receiver_info(hass, entry, receiver),
+                f"{DOMAIN} refresh receiver info {host}",
+            )
+
+        receiver.callbacks.connect.append(refresh_on_connect)
+
+    # Reconnects in the background if not connected.
+    await receiver.async_start()
 
     return True
 
 
+def _cached_receiver_info(entry: OnkyoConfigEntry) -> ReceiverInfo | None:
+    """Return the receiver information cached in the entry, if still usable."""
+    if (data := entry.data.get(CONF_RECEIVER_INFO)) is None:
+        return None
+    info = ReceiverInfo.from_dict(data)
+    if info is None or info.host != entry.data[CONF_HOST]:
+        return None
+    return info
+
+
+@callback
+def _async_store_receiver_info(
+    hass: HomeAssistant, entry: OnkyoConfigEntry, info: ReceiverInfo
+) -> None:
+    """Cache the receiver information in the entry data."""
+    hass.config_entries.async_update_entry(
+        entry,
+        data={
+            **entry.data,
+            CONF_RECEIVER_INFO: info.as_dict(),
+            CONF_RECEIVER_INFO_VALIDATED: dt_util.utcnow().timestamp(),
+        },
+    )
+
+
+async def _async_refresh_receiver_info(
+    hass: HomeAssistant, entry: OnkyoConfigEntry, receiver: Receiver
+) -> None:
+    """Interview the receiver in the background and update the cache."""
+    info = await receiver.async_refresh_info()
+    if info is None:
+        _LOGGER.debug("Could not refresh receiver info: %s", receiver.host)
+        return
+    _async_store_receiver_info(hass, entry, info)
+
+
 async def async_unload_entry(hass: HomeAssistant, entry: OnkyoConfigEntry) -> bool:
     """Unload Onkyo config entry."""
     if DATA_MP_ENTITIES in hass.data and entry.entry_id in hass.data[DATA_MP_ENTITIES]:
@@ -83,11 +162,14 @@ async def async_unload_entry(hass: HomeAssistant, entry: OnkyoConfigEntry) -> bo
     unload_ok = await hass.config_entries.async_unload_platforms(entry, PLATFORMS)
 
     receiver = entry.runtime_data.receiver
-    receiver.conn.close()
+    receiver.close()
 
     return unload_ok
 
 
 async def update_listener(hass: HomeAssistant, entry: OnkyoConfigEntry) -> None:
     """Handle options update."""
+    # Updating the cached receiver info only changes the entry data.
+    if entry.options == entry.runtime_data.options:
+        return
     await hass.config_entries.async_reload(entry.entry_id)
@@ -0,0 +1,124 @@
+"""Audio and video information reported by an Onkyo receiver (IFA/IFV)."""
+
+from __future__ import annotations
+
+from collections.abc import Iterator, Mapping
+import sys
+from typing import Any, ClassVar, Self
+
+AUDIO_INFORMATION_MAPPING = (
+    "audio_input_port",
+    "input_signal_format",
+    "input_frequency",
+    "input_channels",
+    "listening_mode",
+    "output_channels",
+    "output_frequency",
+    "precision_quartz_lock_system",
+    "auto_phase_control_delay",
+    "auto_phase_control_phase",
+)
+
+VIDEO_INFORMATION_MAPPING = (
+    "video_input_port",
+    "input_resolution",
+    "input_color_schema",
+    "input_color_depth",
+    "video_output_port",
+    "output_resolution",
+    "output_color_schema",
+    "output_color_depth",
+    "picture_mode",
+)
+
+
+class _AVInformation(Mapping[str, str]):
+    """Immutable information from an IFA/IFV message.
+
+    Reads as a mapping of the non-empty fields. The mapping is only built
+    when first needed, e.g. when the state is serialized.
+    """
+
+    __slots__ = ("raw", "_fields")
+
+    FIELDS: ClassVar[tuple[str, ...]]
+
+    raw: tuple[str, ...]
+    _fields: dict[str, str] | None
+
+    def __init__(self, raw: tuple[str, ...]) -> None:
+        """Initialize from the values as decoded by pyeiscp."""
+        # The same few values (formats, frequencies, ports) come back all the time.
+        interned = tuple(
+            sys.intern(value) if type(value) is str else value for value in raw
+        )
+        object.__setattr__(self, "raw", interned)
+        object.__setattr__(self, "_fields", None)
+
+    @classmethod
+    def parse(cls, raw: tuple[str, ...], previous: Any = None) -> Self:
+        """Return the information for raw, reusing previous if it is unchanged."""
+        if type(previous) is cls and previous.raw == raw:
+            return previous
+        return cls(raw)
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        """Refuse changes, the information is immutable."""
+        raise AttributeError(f"{type(self).__name__} is immutable")
+
+    def as_dict(self) -> dict[str, str]:
+        """Return the non-empty fields, used to serialize the state."""
+        if (fields := self._fields) is None:
+            fields = {
+                name: value
+                for name, value in zip(self.FIELDS, self.raw, strict=False)
+                if len(value) > 0
+            }
+            object.__setattr__(self, "_fields", fields)
+        return fields
+
+    def __getitem__(self, key: str) -> str:
+        """Return a field."""
+        return self.as_dict()[key]
+
+    def __iter__(self) -> Iterator[str]:
+        """Iterate over the non-empty fields."""
+        return iter(self.as_dict())
+
+    def __len__(self) -> int:
+        """Return the number of non-empty fields."""
+        return len(self.as_dict())
+
+    def __eq__(self, other: object) -> bool:
+        """Compare the raw values, or the fields with another mapping."""
+        if type(other) is type(self):
+            return self.raw == other.raw
+        return super().__eq__(other)
+
+    def __hash__(self) -> int:
+        """Hash the raw values."""
+        return hash(self.raw)
+
+    def __reduce__(self) -> tuple[type[Self], tuple[tuple[str, ...]]]:
+        """Copy and pickle through the constructor."""
+        return type(self), (self.raw,)
+
+    def __repr__(self) -> str:
+        """Return the representation."""
+        return f"{type(self).__name__}({self.raw!r})"
+
+
+class AudioInformation(_AVInformation):
+    """Audio information (IFA)."""
+
+    __slots__ = ()
+
+    FIELDS = AUDIO_INFORMATION_MAPPING
+
+
+class VideoInformation(_AVInformation):
+    """Video information (IFV)."""
+
+    __slots__ = ()
+
+    FIELDS = VIDEO_INFORMATION_MAPPING
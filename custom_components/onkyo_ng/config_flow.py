@@ -14,6 +14,7 @@ from homeassistant.const import CONF_HOST, CONF_NAME
 from homeassistant.core import callback
 from homeassistant.data_entry_flow import FlowResult
 from homeassistant.helpers.selector import (
+    BooleanSelector,
     NumberSelector,
     NumberSelectorConfig,
     NumberSelectorMode,
@@ -29,6 +30,14 @@ from .const import (
     CONF_RECEIVER_MAX_VOLUME,
     CONF_SOURCES,
     DOMAIN,
+    OPTION_COALESCE_STATE_WRITES,
+    OPTION_COALESCE_STATE_WRITES_DEFAULT,
+    OPTION_COALESCE_WINDOW,
+    OPTION_COALESCE_WINDOW_DEFAULT,
+    OPTION_HEARTBEAT_INTERVAL,
+    OPTION_HEARTBEAT_INTERVAL_DEFAULT,
+    OPTION_OPTIMISTIC_STATE,
+    OPTION_OPTIMISTIC_STATE_DEFAULT,
     OPTION_INPUT_SOURCES,
     OPTION_LISTENING_MODES,
     OPTION_MAX_VOLUME,
@@ -39,7 +48,8 @@ from .const import (
     InputSource,
     ListeningMode,
 )
-from .receiver import ReceiverInfo, async_discover, async_interview
+from .discovery import async_get_discovery_cache
+from .receiver import ReceiverInfo, async_interview
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -172,7 +182,7 @@ class OnkyoConfigFlow(ConfigFlow, domain=DOMAIN):
         _LOGGER.debug("Config flow start eiscp discovery")
 
         try:
-            infos = await async_discover()
+            infos = await async_get_discovery_cache(self.hass).async_discover()
         except Exception:
             _LOGGER.exception("Unexpected exception")
             return self.async_abort(reason="unknown")
@@ -365,6 +375,12 @@ class OnkyoOptionsFlowHandler(OptionsFlow):
                         OPTION_VOLUME_RESOLUTION
                     ],
                     OPTION_MAX_VOLUME: user_input[OPTION_MAX_VOLUME],
+                    OPTION_COALESCE_STATE_WRITES: user_input[
+                        OPTION_COALESCE_STATE_WRITES
+                    ],
+                    OPTION_COALESCE_WINDOW: user_input[OPTION_COALESCE_WINDOW],
+                    OPTION_HEARTBEAT_INTERVAL: user_input[OPTION_HEARTBEAT_INTERVAL],
+                    OPTION_OPTIMISTIC_STATE: user_input[OPTION_OPTIMISTIC_STATE],
                     OPTION_INPUT_SOURCES: sources_store,
                     OPTION_LISTENING_MODES: modes_store,
                 }
@@ -379,6 +395,40 @@ class OnkyoOptionsFlowHandler(OptionsFlow):
             )
         )
 
+        coalesce: bool = self.config_entry.options.get(
+            OPTION_COALESCE_STATE_WRITES, OPTION_COALESCE_STATE_WRITES_DEFAULT
+        )
+        schema_dict[vol.Required(OPTION_COALESCE_STATE_WRITES, default=coalesce)] = (
+            BooleanSelector()
+        )
+
+        coalesce_window: float = self.config_entry.options.get(
+            OPTION_COALESCE_WINDOW, OPTION_COALESCE_WINDOW_DEFAULT
+        )
+        schema_dict[vol.Required(OPTION_COALESCE_WINDOW, default=coalesce_window)] = (
+            NumberSelector(
+                NumberSelectorConfig(
+                    min=0, max=1, step=0.05, mode=NumberSelectorMode.BOX
+                )
+            )
+        )
+
+        heartbeat_interval: float = self.config_entry.options.get(
+            OPTION_HEARTBEAT_INTERVAL, OPTION_HEARTBEAT_INTERVAL_DEFAULT
+        )
+        schema_dict[
+            vol.Required(OPTION_HEARTBEAT_INTERVAL, default=heartbeat_interval)
+        ] = NumberSelector(
+            NumberSelectorConfig(min=0, max=600, mode=NumberSelectorMode.BOX)
+        )
+
+        optimistic: bool = self.config_entry.options.get(
+            OPTION_OPTIMISTIC_STATE, OPTION_OPTIMISTIC_STATE_DEFAULT
+        )
+        schema_dict[vol.Required(OPTION_OPTIMISTIC_STATE, default=optimistic)] = (
+            BooleanSelector()
+        )
+
         for source, source_name in self._input_sources.items():
             schema_dict[vol.Required(source.value_meaning, default=source_name)] = (
                 TextSelector()
@@ -10,6 +10,22 @@ DOMAIN = "onkyo_ng"
 
 DEVICE_INTERVIEW_TIMEOUT = 5
 DEVICE_DISCOVERY_TIMEOUT = 5
+# Discovery for listing receivers ends once no new receiver replied for this long.
+DEVICE_DISCOVERY_QUIET_PERIOD = 1
+# Discovery results are reused by config flows and YAML import for this long.
+DISCOVERY_CACHE_TTL = 60
+
+# Receiver information cached in the config entry data, so setup can skip the
+# interview. It is refreshed in the background once older than the interval.
+CONF_RECEIVER_INFO = "receiver_info"
+CONF_RECEIVER_INFO_VALIDATED = "receiver_info_validated"
+RECEIVER_INFO_REVALIDATE_INTERVAL = 3600
+# Zones found on the receiver, by receiver identifier, so their entities are
+# created at setup. The power probe on connect still confirms them.
+CONF_RECEIVER_ZONES = "receiver_zones"
+# Information messages (IFA/IFV) the receiver reported, by receiver identifier,
+# so their sensors are created at setup.
+CONF_RECEIVER_INFORMATION = "receiver_information"
 
 CONF_SOURCES = "sources"
 CONF_MODES = "modes"
@@ -23,6 +39,23 @@ VOLUME_RESOLUTION_ALLOWED: tuple[VolumeResolution, ...] = (50, 80, 100, 200)
 OPTION_MAX_VOLUME = "max_volume"
 OPTION_MAX_VOLUME_DEFAULT = 100.0
 
+# Opt-in: write the state once per event loop iteration, or once per window
+# (in seconds) if set, instead of once per message from the receiver.
+OPTION_COALESCE_STATE_WRITES = "coalesce_state_writes"
+OPTION_COALESCE_STATE_WRITES_DEFAULT = False
+OPTION_COALESCE_WINDOW = "coalesce_window"
+OPTION_COALESCE_WINDOW_DEFAULT = 0.0
+
+# Seconds between heartbeat queries, 0 disables the heartbeat. The connection
+# is re-established after too many heartbeats go unanswered.
+OPTION_HEARTBEAT_INTERVAL = "heartbeat_interval"
+OPTION_HEARTBEAT_INTERVAL_DEFAULT = 30.0
+
+# Opt-in: show volume, mute, source and sound mode changes right away, before
+# the receiver confirms them.
+OPTION_OPTIMISTIC_STATE = "optimistic_state"
+OPTION_OPTIMISTIC_STATE_DEFAULT = False
+
 OPTION_INPUT_SOURCES = "input_sources"
 OPTION_LISTENING_MODES = "listening_modes"
 
@@ -0,0 +1,41 @@
+"""Diagnostics support for Onkyo."""
+
+from __future__ import annotations
+
+from typing import Any
+
+from homeassistant.components.diagnostics import async_redact_data
+from homeassistant.const import CONF_HOST
+from homeassistant.core import HomeAssistant
+
+from . import OnkyoConfigEntry
+from .services import DATA_MP_ENTITIES
+
+TO_REDACT = {CONF_HOST, "host"}
+
+
+async def async_get_config_entry_diagnostics(
+    hass: HomeAssistant, entry: OnkyoConfigEntry
+) -> dict[str, Any]:
+    """Return diagnostics for a config entry."""
+    receiver = entry.runtime_data.receiver
+    entities = hass.data[DATA_MP_ENTITIES].get(entry.entry_id, {})
+
+    return {
+        "entry_data": async_redact_data(entry.data, TO_REDACT),
+        "receiver": {
+            "model_name": receiver.model_name,
+            "identifier": receiver.identifier,
+            "connected": receiver.connected,
+            "heartbeat_rtt": receiver.heartbeat_rtt,
+            "missed_heartbeats": receiver.missed_heartbeats,
+            "reconnect_attempts": receiver.reconnect_attempts,
+            "command_queue": receiver.scheduler.metrics(),
+        },
+        "zones": {
+            zone: {
+                "suppressed_state_writes": entity.suppressed_state_writes,
+            }
+            for zone, entity in entities.items()
+        },
+    }
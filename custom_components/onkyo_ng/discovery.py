@@ -0,0 +1,80 @@
+"""Onkyo receiver discovery, shared across config flows and YAML import."""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+
+from homeassistant.core import HomeAssistant, callback
+
+from .const import DEVICE_DISCOVERY_QUIET_PERIOD, DISCOVERY_CACHE_TTL, DOMAIN
+from .receiver import ReceiverInfo, async_iter_discover
+
+_LOGGER = logging.getLogger(__name__)
+
+DATA_DISCOVERY = f"{DOMAIN}_discovery"
+
+
+class DiscoveryCache:
+    """Discovered receivers by identifier, kept for DISCOVERY_CACHE_TTL seconds.
+
+    Concurrent callers share one in-flight broadcast, and callers within the
+    TTL of the last broadcast get the cached receivers without a new one.
+    """
+
+    def __init__(self, hass: HomeAssistant) -> None:
+        """Initialize the cache."""
+        self._hass = hass
+        self._infos: dict[str, tuple[float, ReceiverInfo]] = {}
+        self._last_broadcast: float | None = None
+        self._broadcast: asyncio.Task[None] | None = None
+
+    @callback
+    def async_add(self, info: ReceiverInfo) -> None:
+        """Add or refresh a discovered receiver."""
+        self._infos[info.identifier] = (self._hass.loop.time(), info)
+
+    @callback
+    def async_infos(self) -> list[ReceiverInfo]:
+        """Return the receivers discovered within the TTL."""
+        expired_before = self._hass.loop.time() - DISCOVERY_CACHE_TTL
+        for identifier, (seen, _) in list(self._infos.items()):
+            if seen < expired_before:
+                del self._infos[identifier]
+        return [info for _, info in self._infos.values()]
+
+    async def async_discover(self) -> list[ReceiverInfo]:
+        """Return the discovered receivers, broadcasting only if the cache is stale."""
+        now = self._hass.loop.time()
+        if (
+            self._broadcast is None
+            and self._last_broadcast is not None
+            and now - self._last_broadcast < DISCOVERY_CACHE_TTL
+        ):
+            _LOGGER.debug("Using cached discovery results")
+            return self.async_infos()
+
+        if self._broadcast is None:
+            self._broadcast = self._hass.async_create_background_task(
+                self._async_broadcast(), f"{DOMAIN} discovery"
+            )
+        await asyncio.shield(self._broadcast)
+        return self.async_infos()
+
+    async def _async_broadcast(self) -> None:
+        try:
+            async for info in async_iter_discover(
+                quiet_period=DEVICE_DISCOVERY_QUIET_PERIOD
+            ):
+                self.async_add(info)
+            self._last_broadcast = self._hass.loop.time()
+        finally:
+            self._broadcast = None
+
+
+@callback
+def async_get_discovery_cache(hass: HomeAssistant) -> DiscoveryCache:
+    """Return the discovery cache shared by all callers."""
+    if (cache := hass.data.get(DATA_DISCOVERY)) is None:
+        cache = hass.data[DATA_DISCOVERY] = DiscoveryCache(hass)
+    return cache
@@ -3,12 +3,20 @@
 from __future__ import annotations
 
 import asyncio
+from collections.abc import Callable, Mapping
+from dataclasses import dataclass
+import functools
 import logging
-from typing import Any, Literal, TypeAlias
+from types import MappingProxyType
+from typing import Any, Literal, TypeAlias, TypeVar
 
 import voluptuous as vol
 
 from homeassistant.components.media_player import (
+    ATTR_INPUT_SOURCE,
+    ATTR_MEDIA_VOLUME_LEVEL,
+    ATTR_MEDIA_VOLUME_MUTED,
+    ATTR_SOUND_MODE,
     PLATFORM_SCHEMA as MEDIA_PLAYER_PLATFORM_SCHEMA,
     MediaPlayerEntity,
     MediaPlayerEntityFeature,
@@ -17,20 +25,33 @@ from homeassistant.components.media_player import (
 )
 from homeassistant.config_entries import SOURCE_IMPORT
 from homeassistant.const import CONF_HOST, CONF_NAME
-from homeassistant.core import DOMAIN as HOMEASSISTANT_DOMAIN, HomeAssistant, callback
+from homeassistant.core import (
+    DOMAIN as HOMEASSISTANT_DOMAIN,
+    HomeAssistant,
+    State,
+    callback,
+)
 from homeassistant.data_entry_flow import FlowResultType
 from homeassistant.helpers import config_validation as cv, entity_registry as er
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
 from homeassistant.helpers.issue_registry import IssueSeverity, async_create_issue
+from homeassistant.helpers.restore_state import RestoreEntity
 from homeassistant.helpers.typing import ConfigType, DiscoveryInfoType
 
 from . import OnkyoConfigEntry
 from .const import (
     CONF_MODES,
     CONF_RECEIVER_MAX_VOLUME,
+    CONF_RECEIVER_ZONES,
     CONF_SOURCES,
     DOMAIN,
+    OPTION_COALESCE_STATE_WRITES,
+    OPTION_COALESCE_STATE_WRITES_DEFAULT,
+    OPTION_COALESCE_WINDOW,
+    OPTION_COALESCE_WINDOW_DEFAULT,
     OPTION_MAX_VOLUME,
+    OPTION_OPTIMISTIC_STATE,
+    OPTION_OPTIMISTIC_STATE_DEFAULT,
     OPTION_VOLUME_RESOLUTION,
     PYEISCP_COMMANDS,
     ZONES,
@@ -38,7 +59,9 @@ from .const import (
     ListeningMode,
     VolumeResolution,
 )
-from .receiver import Receiver, async_discover
+from .av_information import AudioInformation, VideoInformation
+from .discovery import async_get_discovery_cache
+from .receiver import BACKFILL_FRESHNESS, POWER_COMMANDS, Receiver
 from .services import DATA_MP_ENTITIES
 
 _LOGGER = logging.getLogger(__name__)
@@ -108,32 +131,18 @@ ATTR_AUDIO_INFORMATION = "audio_information"
 ATTR_VIDEO_INFORMATION = "video_information"
 ATTR_VIDEO_OUT = "video_out"
 
-AUDIO_VIDEO_INFORMATION_UPDATE_WAIT_TIME = 8
-
-AUDIO_INFORMATION_MAPPING = [
-    "audio_input_port",
-    "input_signal_format",
-    "input_frequency",
-    "input_channels",
-    "listening_mode",
-    "output_channels",
-    "output_frequency",
-    "precision_quartz_lock_system",
-    "auto_phase_control_delay",
-    "auto_phase_control_phase",
-]
-
-VIDEO_INFORMATION_MAPPING = [
-    "video_input_port",
-    "input_resolution",
-    "input_color_schema",
-    "input_color_depth",
-    "video_output_port",
-    "output_resolution",
-    "output_color_schema",
-    "output_color_depth",
-    "picture_mode",
-]
+# After a source change, audio and video information is queried after each of
+# these delays (the last one repeating, up to AV_INFO_REFRESH_MAX_QUERIES
+# times), until two answers in a row match, i.e. the signal has settled.
+AV_INFO_REFRESH_DELAYS = (0.5, 1, 2, 4)
+AV_INFO_REFRESH_MAX_QUERIES = 8
+# Display updates arrive all the time during playback, so they only trigger a
+# refresh this long after the last one settled.
+AV_INFO_REFRESH_HOLDOFF = 8
+
+# With optimistic state, a value the receiver has not confirmed within this
+# many seconds (allowing for resends) is rolled back to the confirmed one.
+OPTIMISTIC_STATE_TIMEOUT = 5
 
 ISSUE_URL_PLACEHOLDER = "/config/integrations/dashboard/add?domain=onkyo"
 
@@ -185,6 +194,57 @@ def _mode_lib_cmds(zone: str) -> dict[ListeningMode, InputLibValue]:
     return result
 
 
+_LibKey = TypeVar("_LibKey", InputSource, ListeningMode)
+
+
+def _reverse_lib_cmds(
+    lib_cmds: Mapping[_LibKey, InputLibValue],
+) -> Mapping[InputLibValue, _LibKey]:
+    """Map library values, single names or tuples as the receiver reports them."""
+    return MappingProxyType({lib_value: key for key, lib_value in lib_cmds.items()})
+
+
+def _lib_cmd_names(
+    lib_cmds: Mapping[_LibKey, InputLibValue],
+) -> Mapping[str, _LibKey]:
+    """Map each single library name, the first one wins."""
+    result: dict[str, _LibKey] = {}
+    for key, lib_value in lib_cmds.items():
+        if isinstance(lib_value, str):
+            result.setdefault(lib_value, key)
+        else:
+            for lib_value_single in lib_value:
+                result.setdefault(lib_value_single, key)
+    return MappingProxyType(result)
+
+
+@dataclass(frozen=True, slots=True)
+class ZoneLibTables:
+    """Library value lookups of a zone, shared by all entities."""
+
+    sources: Mapping[InputSource, InputLibValue]
+    reverse_sources: Mapping[InputLibValue, InputSource]
+    source_names: Mapping[str, InputSource]
+    modes: Mapping[ListeningMode, InputLibValue]
+    reverse_modes: Mapping[InputLibValue, ListeningMode]
+    mode_names: Mapping[str, ListeningMode]
+
+
+@functools.cache
+def zone_lib_tables(zone: str) -> ZoneLibTables:
+    """Return the library value lookups of a zone, built once."""
+    sources = MappingProxyType(_input_lib_cmds(zone))
+    modes = MappingProxyType(_mode_lib_cmds(zone))
+    return ZoneLibTables(
+        sources=sources,
+        reverse_sources=_reverse_lib_cmds(sources),
+        source_names=_lib_cmd_names(sources),
+        modes=modes,
+        reverse_modes=_reverse_lib_cmds(modes),
+        mode_names=_lib_cmd_names(modes),
+    )
+
+
 async def async_setup_platform(
     hass: HomeAssistant,
     config: ConfigType,
@@ -196,12 +256,8 @@ async def async_setup_platform(
 
     source_mapping: dict[str, InputSource] = {}
     for zone in ZONES:
-        for source, source_lib in _input_lib_cmds(zone).items():
-            if isinstance(source_lib, str):
-                source_mapping.setdefault(source_lib, source)
-            else:
-                for source_lib_single in source_lib:
-                    source_mapping.setdefault(source_lib_single, source)
+        for source_lib_single, source in zone_lib_tables(zone).source_names.items():
+            source_mapping.setdefault(source_lib_single, source)
 
     sources: dict[InputSource, str] = {}
     for source_lib_single, source_name in config[CONF_SOURCES].items():
@@ -213,14 +269,8 @@ async def async_setup_platform(
 
     mode_mapping: dict[str, ListeningMode] = {}
     for zone in ZONES:
-        mode_lib_cmds_zone = _mode_lib_cmds(zone)
-        if mode_lib_cmds_zone is not None:
-            for mode, mode_lib in mode_lib_cmds_zone.items():
-                if isinstance(mode_lib, str):
-                    mode_mapping.setdefault(mode_lib, mode)
-                else:
-                    for mode_lib_single in mode_lib:
-                        mode_mapping.setdefault(mode_lib_single, mode)
+        for mode_lib_single, mode in zone_lib_tables(zone).mode_names.items():
+            mode_mapping.setdefault(mode_lib_single, mode)
 
     modes: dict[ListeningMode, str] = {}
     for mode_lib_single, mode_name in config[CONF_MODES].items():
@@ -238,7 +288,7 @@ async def async_setup_platform(
         )
         results.append((host, result))
     else:
-        for info in await async_discover():
+        for info in await async_get_discovery_cache(hass).async_discover():
             host = info.host
 
             # Migrate legacy entities.
@@ -336,22 +386,83 @@ async def async_setup_entry(
 
     volume_resolution: VolumeResolution = entry.options[OPTION_VOLUME_RESOLUTION]
     max_volume: float = entry.options[OPTION_MAX_VOLUME]
+    coalesce_window: float | None = None
+    if entry.options.get(
+        OPTION_COALESCE_STATE_WRITES, OPTION_COALESCE_STATE_WRITES_DEFAULT
+    ):
+        coalesce_window = entry.options.get(
+            OPTION_COALESCE_WINDOW, OPTION_COALESCE_WINDOW_DEFAULT
+        )
+    optimistic: bool = entry.options.get(
+        OPTION_OPTIMISTIC_STATE, OPTION_OPTIMISTIC_STATE_DEFAULT
+    )
     sources = data.sources
     modes = data.modes
 
+    def create_entity(zone: str) -> OnkyoMediaPlayer:
+        zone_entity = entities[zone] = OnkyoMediaPlayer(
+            receiver,
+            zone,
+            volume_resolution=volume_resolution,
+            max_volume=max_volume,
+            coalesce_window=coalesce_window,
+            optimistic=optimistic,
+            sources=sources,
+            modes=modes,
+        )
+        return zone_entity
+
+    @callback
+    def async_store_zones() -> None:
+        hass.config_entries.async_update_entry(
+            entry,
+            data={
+                **entry.data,
+                CONF_RECEIVER_ZONES: {receiver.identifier: sorted(entities)},
+            },
+        )
+
+    # Create the zones found before right away, in one batch, their last state
+    # is restored until the receiver answers.
+    stored_zones = entry.data.get(CONF_RECEIVER_ZONES, {})
+    async_add_entities(
+        [
+            create_entity(zone)
+            for zone in stored_zones.get(receiver.identifier, ())
+            if zone in ZONES
+        ]
+    )
+
+    # Entities added before the receiver is connected (restored from the
+    # stored zones) are queried on the first connect instead of when added.
+    backfill_on_first_connect = not receiver.connected
+
     def connect_callback(receiver: Receiver) -> None:
-        if not receiver.first_connect:
-            for entity in entities.values():
-                if entity.enabled:
-                    entity.backfill_state()
+        if receiver.first_connect and not backfill_on_first_connect:
+            return
+        max_age = None if receiver.first_connect else BACKFILL_FRESHNESS
+        for entity in entities.values():
+            if entity.enabled:
+                entity.backfill_state(max_age=max_age)
 
     def update_callback(receiver: Receiver, message: tuple[str, str, Any]) -> None:
-        zone, _, value = message
-        entity = entities.get(zone)
-        if entity is not None:
-            if entity.enabled:
-                entity.process_update(message)
-        elif zone in ZONES and value != "N/A":
+        # Messages for existing entities are routed to their subscriptions,
+        # this only discovers the zones.
+        zone, command, value = message
+        if zone in entities:
+            if command in POWER_COMMANDS and value == "N/A":
+                # A stored zone the receiver no longer has.
+                _LOGGER.debug(
+                    "%s no longer available on %s (%s)",
+                    ZONES[zone],
+                    receiver.model_name,
+                    receiver.host,
+                )
+                if (entity_id := entities.pop(zone).entity_id) is not None:
+                    er.async_get(hass).async_remove(entity_id)
+                async_store_zones()
+            return
+        if zone in ZONES and value != "N/A":
             # When we receive the status for a zone, and the value is not "N/A",
             # then zone is available on the receiver, so we create the entity for it.
             _LOGGER.debug(
@@ -360,30 +471,39 @@ async def async_setup_entry(
                 receiver.model_name,
                 receiver.host,
             )
-            zone_entity = OnkyoMediaPlayer(
-                receiver,
-                zone,
-                volume_resolution=volume_resolution,
-                max_volume=max_volume,
-                sources=sources,
-                modes=modes,
-            )
-            entities[zone] = zone_entity
-            async_add_entities([zone_entity])
+            async_add_entities([create_entity(zone)])
+            async_store_zones()
 
     receiver.callbacks.connect.append(connect_callback)
     receiver.callbacks.update.append(update_callback)
 
 
-class OnkyoMediaPlayer(MediaPlayerEntity):
+@dataclass(slots=True)
+class _OptimisticValue:
+    """Value shown before the receiver confirmed it."""
+
+    expected: Any
+    confirmed: Any
+    handle: asyncio.TimerHandle
+
+
+class OnkyoMediaPlayer(MediaPlayerEntity, RestoreEntity):
     """Representation of an Onkyo Receiver Media Player (one per each zone)."""
 
     _attr_should_poll = False
+    # Also available as sensors, recording every change here would write the
+    # whole blobs to the database.
+    _unrecorded_attributes = frozenset(
+        {ATTR_AUDIO_INFORMATION, ATTR_VIDEO_INFORMATION}
+    )
 
     _supports_volume: bool = False
     _supports_audio_info: bool = False
     _supports_video_info: bool = False
-    _query_timer: asyncio.TimerHandle | None = None
+    _av_info_refresh: asyncio.Task[None] | None = None
+    _av_info_settled: float | None = None
+    _flush_handle: asyncio.Handle | None = None
+    _written_state: tuple[Any, ...] | None = None
 
     def __init__(
         self,
@@ -392,6 +512,8 @@ class OnkyoMediaPlayer(MediaPlayerEntity):
         *,
         volume_resolution: VolumeResolution,
         max_volume: float,
+        coalesce_window: float | None = None,
+        optimistic: bool = False,
         sources: dict[InputSource, str],
         modes: dict[ListeningMode, str],
     ) -> None:
@@ -403,36 +525,72 @@ class OnkyoMediaPlayer(MediaPlayerEntity):
         self._attr_unique_id = f"{identifier}_{zone}"
 
         self._zone = zone
+        self._handlers = ZONE_HANDLERS[zone]
 
         self._volume_resolution = volume_resolution
         self._max_volume = max_volume
+        self._coalesce_window = coalesce_window
+        self._optimistic = optimistic
+        self._optimistic_values: dict[str, _OptimisticValue] = {}
 
         self._name_mapping = sources
         self._mode_mapping = modes
         self._reverse_name_mapping = {value: key for key, value in sources.items()}
         self._reverse_mode_mapping = {value: key for key, value in modes.items()}
-        self._lib_mapping = _input_lib_cmds(zone)
-        self._mode_lib_mapping = _mode_lib_cmds(zone)
-        self._reverse_lib_mapping = {
-            value: key for key, value in self._lib_mapping.items()
-        }
-        self._reverse_mode_lib_mapping = {
-            value: key for key, value in self._mode_lib_mapping.items()
-        }
+        lib_tables = zone_lib_tables(zone)
+        self._lib_mapping = lib_tables.sources
+        self._mode_lib_mapping = lib_tables.modes
+        self._reverse_lib_mapping = lib_tables.reverse_sources
+        self._reverse_mode_lib_mapping = lib_tables.reverse_modes
 
         self._attr_source_list = list(sources.values())
         self._attr_sound_mode_list = list(modes.values())
         self._attr_extra_state_attributes = {}
 
+        # Messages that did not change the state, so no state was written.
+        self.suppressed_state_writes = 0
+
     async def async_added_to_hass(self) -> None:
         """Entity has been added to hass."""
-        self.backfill_state()
+        if (last_state := await self.async_get_last_state()) is not None:
+            self._restore_state(last_state)
+        self.async_on_remove(
+            self._receiver.subscribe(self._zone, self._handlers, self._on_message)
+        )
+        if self._receiver.connected:
+            self.backfill_state()
+
+    @callback
+    def _restore_state(self, last_state: State) -> None:
+        """Seed the state with the last known one, until the receiver reports."""
+        if last_state.state not in (MediaPlayerState.ON, MediaPlayerState.OFF):
+            return
+        self._attr_state = MediaPlayerState(last_state.state)
+        attributes = last_state.attributes
+        if (volume_level := attributes.get(ATTR_MEDIA_VOLUME_LEVEL)) is not None:
+            self._supports_volume = True
+            self._attr_volume_level = volume_level
+        self._attr_is_volume_muted = attributes.get(ATTR_MEDIA_VOLUME_MUTED)
+        self._attr_source = attributes.get(ATTR_INPUT_SOURCE)
+        self._attr_sound_mode = attributes.get(ATTR_SOUND_MODE)
+        for attribute in (
+            ATTR_AUDIO_INFORMATION,
+            ATTR_VIDEO_INFORMATION,
+            ATTR_PRESET,
+            ATTR_VIDEO_OUT,
+        ):
+            if attribute in attributes:
+                self._attr_extra_state_attributes[attribute] = attributes[attribute]
 
     async def async_will_remove_from_hass(self) -> None:
-        """Cancel the query timer when the entity is removed."""
-        if self._query_timer:
-            self._query_timer.cancel()
-            self._query_timer = None
+        """Cancel the pending refreshes when the entity is removed."""
+        self._cancel_av_info_refresh()
+        if self._flush_handle:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        for optimistic_value in self._optimistic_values.values():
+            optimistic_value.handle.cancel()
+        self._optimistic_values.clear()
 
     @property
     def supported_features(self) -> MediaPlayerEntityFeature:
@@ -448,12 +606,19 @@ class OnkyoMediaPlayer(MediaPlayerEntity):
     @callback
     def _update_receiver(self, propname: str, value: Any) -> None:
         """Update a property in the receiver."""
-        self._receiver.conn.update_property(self._zone, propname, value)
+        self._receiver.update_property(self._zone, propname, value)
 
     @callback
-    def _query_receiver(self, propname: str) -> None:
-        """Cause the receiver to send an update about a property."""
-        self._receiver.conn.query_property(self._zone, propname)
+    def _query_receiver(self, propname: str, max_age: float | None = None) -> None:
+        """Cause the receiver to send an update about a property.
+
+        With max_age, skip properties the receiver reported more recently.
+        """
+        if max_age is not None and self._receiver.is_fresh(
+            self._zone, propname, max_age
+        ):
+            return
+        self._receiver.query_property(self._zone, propname)
 
     async def async_turn_on(self) -> None:
         """Turn the media player on."""
@@ -473,8 +638,13 @@ class OnkyoMediaPlayer(MediaPlayerEntity):
         scale for the receiver.
         """
         # HA_VOL * (MAX VOL / 100) * VOL_RESOLUTION
-        self._update_receiver(
-            "volume", int(volume * (self._max_volume / 100) * self._volume_resolution)
+        # Dragging a slider sets the volume many times a second, so only the
+        # newest value is sent once the receiver has had time for the last one.
+        receiver_volume = int(volume * (self._max_volume / 100) * self._volume_resolution)
+        self._receiver.update_property_coalesced(self._zone, "volume", receiver_volume)
+        self._set_optimistic(
+            "_attr_volume_level",
+            min(1, receiver_volume / (self._volume_resolution * self._max_volume / 100)),
         )
 
     async def async_volume_up(self) -> None:
@@ -491,6 +661,7 @@ class OnkyoMediaPlayer(MediaPlayerEntity):
             "audio-muting" if self._zone == "main" else "muting",
             "on" if mute else "off",
         )
+        self._set_optimistic("_attr_is_volume_muted", mute)
 
     async def async_select_source(self, source: str) -> None:
         """Select input source."""
@@ -503,6 +674,7 @@ class OnkyoMediaPlayer(MediaPlayerEntity):
             self._update_receiver(
                 "input-selector" if self._zone == "main" else "selector", source_lib_single
             )
+            self._set_optimistic("_attr_source", source)
 
     async def async_select_sound_mode(self, sound_mode: str) -> None:
         """Select sound mode."""
@@ -516,6 +688,7 @@ class OnkyoMediaPlayer(MediaPlayerEntity):
                 "listening-mode" if self._zone == "main" else "listening-mode",
                 mode_lib_single,
             )
+            self._set_optimistic("_attr_sound_mode", sound_mode)
 
     async def async_select_output(self, hdmi_output: str) -> None:
         """Set hdmi-out."""
@@ -531,74 +704,204 @@ class OnkyoMediaPlayer(MediaPlayerEntity):
                 self._update_receiver("preset", media_id)
 
     @callback
-    def backfill_state(self) -> None:
+    def _set_optimistic(self, attribute: str, expected: Any) -> None:
+        """Show a value right away, until the receiver confirms it.
+
+        Does nothing unless optimistic state is enabled.
+        """
+        if not self._optimistic:
+            return
+        if (optimistic_value := self._optimistic_values.get(attribute)) is not None:
+            optimistic_value.handle.cancel()
+            confirmed = optimistic_value.confirmed
+        else:
+            confirmed = getattr(self, attribute)
+        self._optimistic_values[attribute] = _OptimisticValue(
+            expected,
+            confirmed,
+            self.hass.loop.call_later(
+                OPTIMISTIC_STATE_TIMEOUT, self._async_rollback, attribute
+            ),
+        )
+        setattr(self, attribute, expected)
+        self._async_write_state_if_changed()
+
+    @callback
+    def _reconcile(self, attribute: str) -> None:
+        """Check a value the receiver reported against the one shown."""
+        optimistic_value = self._optimistic_values[attribute]
+        reported = getattr(self, attribute)
+        if reported == optimistic_value.expected:
+            optimistic_value.handle.cancel()
+            del self._optimistic_values[attribute]
+            return
+        # Likely an earlier value still on its way (e.g. while dragging the
+        # volume), keep showing the newest one until confirmed or timed out.
+        optimistic_value.confirmed = reported
+        setattr(self, attribute, optimistic_value.expected)
+
+    @callback
+    def _async_rollback(self, attribute: str) -> None:
+        """Show the confirmed value again, the receiver never reported the new one."""
+        optimistic_value = self._optimistic_values.pop(attribute)
+        _LOGGER.warning(
+            "%s did not confirm %s=%s, rolling back to %s",
+            self.entity_id,
+            attribute.removeprefix("_attr_"),
+            optimistic_value.expected,
+            optimistic_value.confirmed,
+        )
+        setattr(self, attribute, optimistic_value.confirmed)
+        self._async_write_state_if_changed()
+
+    @callback
+    def backfill_state(self, max_age: float | None = None) -> None:
         """Get the receiver to send all the info we care about.
 
         Usually run only on connect, as we can otherwise rely on the
-        receiver to keep us informed of changes.
+        receiver to keep us informed of changes. With max_age, only the
+        properties not reported within max_age seconds are queried.
         """
-        self._query_receiver("power")
-        self._query_receiver("volume")
-        self._query_receiver("preset")
+        self._query_receiver("power", max_age)
+        self._query_receiver("volume", max_age)
+        self._query_receiver("preset", max_age)
         if self._zone == "main":
-            self._query_receiver("hdmi-output-selector")
-            self._query_receiver("audio-muting")
-            self._query_receiver("input-selector")
-            self._query_receiver("listening-mode")
-            self._query_receiver("audio-information")
-            self._query_receiver("video-information")
+            self._query_receiver("hdmi-output-selector", max_age)
+            self._query_receiver("audio-muting", max_age)
+            self._query_receiver("input-selector", max_age)
+            self._query_receiver("listening-mode", max_age)
+            self._query_receiver("audio-information", max_age)
+            self._query_receiver("video-information", max_age)
         else:
-            self._query_receiver("muting")
-            self._query_receiver("selector")
+            self._query_receiver("muting", max_age)
+            self._query_receiver("selector", max_age)
+
+    @callback
+    def _on_message(self, receiver: Receiver, message: tuple[str, str, Any]) -> None:
+        """Handle a message the entity subscribed to."""
+        self.process_update(message)
 
     @callback
     def process_update(self, update: tuple[str, str, Any]) -> None:
         """Store relevant updates so they can be queried later."""
-        zone, command, value = update
-        if zone != self._zone:
+        _, command, value = update
+        handler = self._handlers.get(command)
+        if handler is None:
             return
 
-        if command in ["system-power", "power"]:
-            if value == "on":
-                self._attr_state = MediaPlayerState.ON
+        if self._optimistic_values and (
+            attribute := OPTIMISTIC_ATTRIBUTES.get(command)
+        ) in self._optimistic_values:
+            # Decode against the confirmed value, so that a message the handler
+            # ignores (e.g. N/A) does not read as confirming the optimistic one.
+            setattr(self, attribute, self._optimistic_values[attribute].confirmed)
+            handler(self, value)
+            self._reconcile(attribute)
+        else:
+            handler(self, value)
+
+        if self._coalesce_window is None:
+            self._async_write_state_if_changed()
+        elif self._flush_handle is None:
+            # Collect the rest of the burst, then write the state once.
+            if self._coalesce_window > 0:
+                self._flush_handle = self.hass.loop.call_later(
+                    self._coalesce_window, self._async_flush_state
+                )
             else:
-                self._attr_state = MediaPlayerState.OFF
-                self._attr_extra_state_attributes.pop(ATTR_AUDIO_INFORMATION, None)
-                self._attr_extra_state_attributes.pop(ATTR_VIDEO_INFORMATION, None)
-                self._attr_extra_state_attributes.pop(ATTR_PRESET, None)
-                self._attr_extra_state_attributes.pop(ATTR_VIDEO_OUT, None)
-        elif command in ["volume", "master-volume"] and value != "N/A":
-            self._supports_volume = True
-            # AMP_VOL / (VOL_RESOLUTION * (MAX_VOL / 100))
-            volume_level: float = value / (
-                self._volume_resolution * self._max_volume / 100
-            )
-            self._attr_volume_level = min(1, volume_level)
-        elif command in ["muting", "audio-muting"]:
-            self._attr_is_volume_muted = bool(value == "on")
-        elif command in ["selector", "input-selector"]:
-            self._parse_source(value)
-            self._query_av_info_delayed()
-        elif command in ["listening-mode"]:
-            self._parse_mode(value)
-        elif command == "hdmi-output-selector":
-            self._attr_extra_state_attributes[ATTR_VIDEO_OUT] = ",".join(value)
-        elif command == "preset":
-            if self.source is not None and self.source.lower() == "radio":
-                self._attr_extra_state_attributes[ATTR_PRESET] = value
-            elif ATTR_PRESET in self._attr_extra_state_attributes:
-                del self._attr_extra_state_attributes[ATTR_PRESET]
-        elif command == "audio-information":
-            self._supports_audio_info = True
-            self._parse_audio_information(value)
-        elif command == "video-information":
-            self._supports_video_info = True
-            self._parse_video_information(value)
-        elif command == "fl-display-information":
-            self._query_av_info_delayed()
+                self._flush_handle = self.hass.loop.call_soon(self._async_flush_state)
+
+    @callback
+    def _async_flush_state(self) -> None:
+        """Write the state collected from a burst of messages."""
+        self._flush_handle = None
+        self._async_write_state_if_changed()
 
+    @callback
+    def _async_write_state_if_changed(self) -> None:
+        """Write the state, unless nothing written to it has changed."""
+        snapshot = (
+            self._attr_state,
+            self._attr_volume_level,
+            self._attr_is_volume_muted,
+            self._attr_source,
+            self._attr_sound_mode,
+            self._supports_volume,
+            # Values are replaced rather than mutated, a shallow copy is enough.
+            dict(self._attr_extra_state_attributes),
+        )
+        if snapshot == self._written_state:
+            self.suppressed_state_writes += 1
+            return
+
+        self._written_state = snapshot
         self.async_write_ha_state()
 
+    @callback
+    def _process_power(self, value: Any) -> None:
+        if value == "on":
+            self._attr_state = MediaPlayerState.ON
+        else:
+            self._attr_state = MediaPlayerState.OFF
+            self._attr_extra_state_attributes.pop(ATTR_AUDIO_INFORMATION, None)
+            self._attr_extra_state_attributes.pop(ATTR_VIDEO_INFORMATION, None)
+            self._attr_extra_state_attributes.pop(ATTR_PRESET, None)
+            self._attr_extra_state_attributes.pop(ATTR_VIDEO_OUT, None)
+            self._cancel_av_info_refresh()
+
+    @callback
+    def _process_volume(self, value: Any) -> None:
+        if value == "N/A":
+            return
+        self._supports_volume = True
+        # AMP_VOL / (VOL_RESOLUTION * (MAX_VOL / 100))
+        volume_level: float = value / (
+            self._volume_resolution * self._max_volume / 100
+        )
+        self._attr_volume_level = min(1, volume_level)
+
+    @callback
+    def _process_muting(self, value: Any) -> None:
+        self._attr_is_volume_muted = bool(value == "on")
+
+    @callback
+    def _process_source(self, value: Any) -> None:
+        self._parse_source(value)
+        self._refresh_av_info()
+
+    @callback
+    def _process_mode(self, value: Any) -> None:
+        self._parse_mode(value)
+
+    @callback
+    def _process_video_out(self, value: Any) -> None:
+        self._attr_extra_state_attributes[ATTR_VIDEO_OUT] = ",".join(value)
+
+    @callback
+    def _process_preset(self, value: Any) -> None:
+        if self.source is not None and self.source.lower() == "radio":
+            self._attr_extra_state_attributes[ATTR_PRESET] = value
+        elif ATTR_PRESET in self._attr_extra_state_attributes:
+            del self._attr_extra_state_attributes[ATTR_PRESET]
+
+    @callback
+    def _process_audio_information(self, value: Any) -> None:
+        self._supports_audio_info = True
+        self._parse_audio_information(value)
+
+    @callback
+    def _process_video_information(self, value: Any) -> None:
+        self._supports_video_info = True
+        self._parse_video_information(value)
+
+    @callback
+    def _process_fl_display_information(self, value: Any) -> None:
+        if (
+            self._av_info_settled is None
+            or self.hass.loop.time() - self._av_info_settled > AV_INFO_REFRESH_HOLDOFF
+        ):
+            self._refresh_av_info()
+
     @callback
     def _parse_source(self, source_lib: InputLibValue) -> None:
         source = self._reverse_lib_mapping[source_lib]
@@ -639,13 +942,10 @@ class OnkyoMediaPlayer(MediaPlayerEntity):
             self._attr_extra_state_attributes.pop(ATTR_AUDIO_INFORMATION, None)
             return
 
-        self._attr_extra_state_attributes[ATTR_AUDIO_INFORMATION] = {
-            name: value
-            for name, value in zip(
-                AUDIO_INFORMATION_MAPPING, audio_information, strict=False
-            )
-            if len(value) > 0
-        }
+        attributes = self._attr_extra_state_attributes
+        attributes[ATTR_AUDIO_INFORMATION] = AudioInformation.parse(
+            audio_information, attributes.get(ATTR_AUDIO_INFORMATION)
+        )
 
     @callback
     def _parse_video_information(
@@ -657,25 +957,103 @@ class OnkyoMediaPlayer(MediaPlayerEntity):
             self._attr_extra_state_attributes.pop(ATTR_VIDEO_INFORMATION, None)
             return
 
-        self._attr_extra_state_attributes[ATTR_VIDEO_INFORMATION] = {
-            name: value
-            for name, value in zip(
-                VIDEO_INFORMATION_MAPPING, video_information, strict=False
-            )
-            if len(value) > 0
+        attributes = self._attr_extra_state_attributes
+        attributes[ATTR_VIDEO_INFORMATION] = VideoInformation.parse(
+            video_information, attributes.get(ATTR_VIDEO_INFORMATION)
+        )
+
+    @callback
+    def _refresh_av_info(self) -> None:
+        """Refresh the audio and video information until the signal settles.
+
+        Triggers while a refresh is running share it.
+        """
+        if (
+            self._zone != "main"
+            or self._av_info_refresh is not None
+            or self._attr_state != MediaPlayerState.ON
+        ):
+            return
+        self._av_info_refresh = self.hass.async_create_background_task(
+            self._async_refresh_av_info(), f"{self.entity_id} refresh av info"
+        )
+
+    @callback
+    def _cancel_av_info_refresh(self) -> None:
+        if self._av_info_refresh is not None:
+            self._av_info_refresh.cancel()
+            self._av_info_refresh = None
+
+    async def _async_refresh_av_info(self) -> None:
+        propnames = []
+        if self._supports_audio_info:
+            propnames.append("audio-information")
+        if self._supports_video_info:
+            propnames.append("video-information")
+
+        previous: list[Any] | None = None
+        try:
+            for attempt in range(AV_INFO_REFRESH_MAX_QUERIES):
+                await asyncio.sleep(
+                    AV_INFO_REFRESH_DELAYS[min(attempt, len(AV_INFO_REFRESH_DELAYS) - 1)]
+                )
+                if not propnames or self._attr_state != MediaPlayerState.ON:
+                    return
+                # The answers update the entity through process_update.
+                answers = await asyncio.gather(
+                    *(
+                        self._receiver.async_query(self._zone, propname)
+                        for propname in propnames
+                    ),
+                    return_exceptions=True,
+                )
+                if answers == previous:
+                    return
+                previous = answers
+        finally:
+            if self._av_info_refresh is asyncio.current_task():
+                self._av_info_refresh = None
+                self._av_info_settled = self.hass.loop.time()
+
+
+_MessageHandler: TypeAlias = Callable[[OnkyoMediaPlayer, Any], None]
+
+
+def _zone_handlers(zone: str) -> Mapping[str, _MessageHandler]:
+    """Build the command (as named by pyeiscp) to handler table for a zone."""
+    handlers: dict[str, _MessageHandler] = {
+        "system-power": OnkyoMediaPlayer._process_power,
+        "power": OnkyoMediaPlayer._process_power,
+        "master-volume": OnkyoMediaPlayer._process_volume,
+        "volume": OnkyoMediaPlayer._process_volume,
+        "audio-muting": OnkyoMediaPlayer._process_muting,
+        "muting": OnkyoMediaPlayer._process_muting,
+        "input-selector": OnkyoMediaPlayer._process_source,
+        "selector": OnkyoMediaPlayer._process_source,
+        "listening-mode": OnkyoMediaPlayer._process_mode,
+        "preset": OnkyoMediaPlayer._process_preset,
+    }
+    if zone == "main":
+        handlers |= {
+            "hdmi-output-selector": OnkyoMediaPlayer._process_video_out,
+            "audio-information": OnkyoMediaPlayer._process_audio_information,
+            "video-information": OnkyoMediaPlayer._process_video_information,
+            "fl-display-information": OnkyoMediaPlayer._process_fl_display_information,
         }
+    return MappingProxyType(handlers)
 
-    def _query_av_info_delayed(self) -> None:
-        if self._zone == "main" and not self._query_timer:
 
-            @callback
-            def _query_av_info() -> None:
-                if self._supports_audio_info:
-                    self._query_receiver("audio-information")
-                if self._supports_video_info:
-                    self._query_receiver("video-information")
-                self._query_timer = None
+ZONE_HANDLERS = {zone: _zone_handlers(zone) for zone in ZONES}
 
-            self._query_timer = self.hass.loop.call_later(
-                AUDIO_VIDEO_INFORMATION_UPDATE_WAIT_TIME, _query_av_info
-            )
+# Entity attribute each command reports, to reconcile optimistic values with.
+OPTIMISTIC_ATTRIBUTES: Mapping[str, str] = MappingProxyType(
+    {
+        "master-volume": "_attr_volume_level",
+        "volume": "_attr_volume_level",
+        "audio-muting": "_attr_is_volume_muted",
+        "muting": "_attr_is_volume_muted",
+        "input-selector": "_attr_source",
+        "selector": "_attr_source",
+        "listening-mode": "_attr_sound_mode",
+    }
+)
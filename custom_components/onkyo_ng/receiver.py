@@ -3,100 +3,321 @@
 from __future__ import annotations
 
 import asyncio
-from collections.abc import Callable, Iterable
+from collections import deque
+from collections.abc import AsyncIterator, Callable, Iterable, Mapping
 import contextlib
-from dataclasses import dataclass, field
+from dataclasses import asdict, dataclass, field, replace
+import functools
 import logging
+import random
 from typing import Any
 
 import pyeiscp
+from pyeiscp.protocol import command_to_packet
 
-from .const import DEVICE_DISCOVERY_TIMEOUT, DEVICE_INTERVIEW_TIMEOUT, ZONES, InputSource
+from .const import (
+    DEVICE_DISCOVERY_TIMEOUT,
+    DEVICE_INTERVIEW_TIMEOUT,
+    OPTION_HEARTBEAT_INTERVAL_DEFAULT,
+    ZONES,
+    InputSource,
+)
+from .scheduler import CommandPriority, CommandScheduler
 
 _LOGGER = logging.getLogger(__name__)
 
 
-async def async_query_custom_input_names(host: str, port: int = 60128, timeout: int = 5) -> dict[str, str]:
+IRN_QUERY_INPUT_IDS = ("00", "01", "02", "03", "04", "05", "10", "23", "24", "25", "26")
+
+# Number of IRN queries kept in flight at once, and how often each is sent
+# before the input is given up on.
+IRN_QUERY_WINDOW = 8
+IRN_QUERY_ATTEMPTS = 2
+
+# An unanswered query is retried after this many measured round trips
+# (but never sooner than the minimum). Before the first reply arrives
+# there is no measurement yet, so the initial timeout is used.
+IRN_REPLY_TIMEOUT_ROUND_TRIPS = 4
+IRN_REPLY_TIMEOUT_MIN = 0.25
+IRN_REPLY_TIMEOUT_INITIAL = 1.0
+
+# Default time to wait for the answer to an awaited query.
+QUERY_TIMEOUT = 2.0
+
+# The connection is considered dead after this many heartbeats in a row were
+# not answered within HEARTBEAT_TIMEOUT. After a missed heartbeat, the next
+# one is sent after HEARTBEAT_RETRY_INTERVAL instead of the full interval.
+HEARTBEAT_MISSED_BEATS = 3
+HEARTBEAT_TIMEOUT = 5.0
+HEARTBEAT_RETRY_INTERVAL = 1.0
+
+# Delay before reconnecting, doubled after each failed attempt up to the
+# maximum. The actual delay is randomized between half and all of it.
+RECONNECT_DELAY_MIN = 1.0
+RECONNECT_DELAY_MAX = 60.0
+# A reconnect attempt to a host that does not answer is given up after this long.
+RECONNECT_TIMEOUT = 10.0
+
+# On reconnect, properties the receiver confirmed within this many seconds
+# are not queried again.
+BACKFILL_FRESHNESS = 30.0
+
+# Receivers report their status right after powering on, but ignore commands
+# for a while longer. Set commands for a zone that is powering on are held
+# until POWER_ON_READY_DELAY after the zone reported it is on, or until
+# POWER_ON_WARMUP_TIMEOUT if it does not report.
+POWER_ON_WARMUP_TIMEOUT = 5.0
+POWER_ON_READY_DELAY = 2.0
+POWER_COMMANDS = frozenset({"system-power", "power"})
+
+# Values that step or toggle a property instead of setting it. Sending one
+# twice steps twice, so they are sent once, without waiting for the echo.
+RELATIVE_VALUES = frozenset(
+    {
+        "up",
+        "down",
+        "level-up",
+        "level-down",
+        "level-up-1db-step",
+        "level-down-1db-step",
+        "toggle",
+    }
+)
+
+# Minimum time between two sends of a latest-wins property (e.g. volume while
+# a slider is dragged). Values set in between replace each other.
+COALESCED_COMMAND_INTERVAL = 0.25
+
+
+def _send_raw(conn: pyeiscp.Connection, iscp_message: str) -> None:
+    """Send a raw ISCP message to the receiver.
+
+    pyeiscp only knows the set form of some commands (e.g. IRN), so
+    `Connection.send` refuses to format their queries.
+    """
+    if conn.protocol.transport is None:
+        raise ConnectionError("Receiver is not connected")
+    conn.protocol.transport.write(command_to_packet(iscp_message))
+
+
+@functools.cache
+def _response_key(zone: str, propname: str) -> tuple[str, str]:
+    """Return the (zone, command) a query is answered with, as decoded by pyeiscp.
+
+    Replies are decoded to the first zone that knows the ISCP command, and
+    the command's name in that zone (e.g. main "power" is answered with
+    main "system-power").
+    """
+    commands = pyeiscp.commands.COMMANDS
+    prefix = pyeiscp.commands.COMMAND_MAPPINGS.get(zone, {}).get(propname, propname)
+    for response_zone, zone_commands in commands.items():
+        if prefix in zone_commands:
+            return response_zone, zone_commands[prefix]["name"]
+    return zone, propname
+
+
+def _parse_irn_reply(message: tuple[str, str, Any]) -> tuple[str, str] | None:
+    """Parse an IRN (Input Rename) response into input ID and custom name."""
+    if len(message) < 3:
+        return None
+    _, command, value = message[:3]
+    if command != "input-selector-rename-input-function-rename":
+        return None
+    # pyeiscp splits values containing a comma into a tuple.
+    if isinstance(value, tuple):
+        value = ",".join(value)
+    # IRN response format: "iixxxxxxxxxx" where ii=input_id, xxxxxxxxxx=name
+    if not isinstance(value, str) or len(value) < 2:
+        return None
+    return value[:2], value[2:].strip()
+
+
+class _PipelinedQuery:
+    """Keep a bounded number of queries in flight, matching replies by key.
+
+    Queries that are not answered within a few round trips are retried,
+    up to the given number of attempts, without resending the answered ones.
+    """
+
+    def __init__(
+        self,
+        send: Callable[[str], None],
+        keys: Iterable[str],
+        *,
+        window: int = IRN_QUERY_WINDOW,
+        attempts: int = IRN_QUERY_ATTEMPTS,
+    ) -> None:
+        """Initialize the query."""
+        self._send = send
+        self._window = window
+        self._attempts = attempts
+        self._loop = asyncio.get_running_loop()
+        self._pending: deque[str] = deque(dict.fromkeys(keys))
+        self._sent_count: dict[str, int] = {}
+        self._in_flight: dict[str, float] = {}
+        self._progress = asyncio.Event()
+        self._round_trip: float | None = None
+        self.answered: set[str] = set()
+        self.missing: set[str] = set()
+
+    @property
+    def reply_timeout(self) -> float:
+        """Time to wait for a reply before the query is retried."""
+        if self._round_trip is None:
+            return IRN_REPLY_TIMEOUT_INITIAL
+        return max(
+            IRN_REPLY_TIMEOUT_MIN, IRN_REPLY_TIMEOUT_ROUND_TRIPS * self._round_trip
+        )
+
+    def on_reply(self, key: str) -> None:
+        """Record a reply for the given key."""
+        if key in self.answered:
+            return
+        sent = self._in_flight.pop(key, None)
+        if sent is not None:
+            round_trip = self._loop.time() - sent
+            if self._round_trip is None:
+                self._round_trip = round_trip
+            else:
+                self._round_trip = 0.8 * self._round_trip + 0.2 * round_trip
+        elif key in self._pending:
+            self._pending.remove(key)
+        elif key not in self._sent_count:
+            # Unsolicited reply for a key we never asked about.
+            return
+        self.missing.discard(key)
+        self.answered.add(key)
+        self._progress.set()
+
+    def _fill_window(self) -> None:
+        while self._pending and len(self._in_flight) < self._window:
+            key = self._pending.popleft()
+            self._sent_count[key] = self._sent_count.get(key, 0) + 1
+            self._in_flight[key] = self._loop.time()
+            self._send(key)
+
+    def _expire(self) -> None:
+        """Retry or give up on queries that have not been answered in time."""
+        expired_before = self._loop.time() - self.reply_timeout
+        for key, sent in list(self._in_flight.items()):
+            if sent > expired_before:
+                continue
+            del self._in_flight[key]
+            if self._sent_count[key] < self._attempts:
+                self._pending.append(key)
+            else:
+                self.missing.add(key)
+
+    async def async_run(self, timeout: float) -> None:
+        """Send all queries and wait until each is answered or given up on."""
+        deadline = self._loop.time() + timeout
+        while True:
+            self._expire()
+            self._fill_window()
+            if not self._in_flight:
+                return
+
+            now = self._loop.time()
+            if now >= deadline:
+                self.missing.update(self._in_flight)
+                self.missing.update(self._pending)
+                self._in_flight.clear()
+                self._pending.clear()
+                return
+
+            next_expiry = min(self._in_flight.values()) + self.reply_timeout
+            self._progress.clear()
+            with contextlib.suppress(asyncio.TimeoutError):
+                await asyncio.wait_for(
+                    self._progress.wait(), max(min(deadline, next_expiry) - now, 0)
+                )
+
+
+async def async_query_custom_input_names(
+    host: str,
+    port: int = 60128,
+    timeout: int = 5,
+    input_ids: Iterable[str] = IRN_QUERY_INPUT_IDS,
+) -> dict[str, str]:
     """
     Query custom input names from an Onkyo receiver.
-    
+
+    Opens a temporary connection; see `Receiver.async_query_custom_input_names`
+    to query over a connection that stays open.
+
     Args:
         host: Receiver IP address
         port: Receiver port (default 60128)
-        timeout: Query timeout in seconds
-        
+        timeout: Overall query timeout in seconds, including connecting
+        input_ids: Input IDs to query
+
     Returns:
         Dictionary mapping input IDs to their custom names
     """
-    custom_names = {}
-    
-    def on_connect(origin: str):
-        _LOGGER.debug(f"Connected to {origin} for input name query")
-    
-    def on_update(message: tuple[str, str, Any], origin: str):
-        """Process received messages looking for input rename responses."""
-        if len(message) >= 3:
-            zone, command, value = message[:3]
-            _LOGGER.debug(f"Input name query received: zone={zone}, command={command}, value={value}")
-            
-            # Check if this is an IRN (Input Rename) response
-            if command == "input-selector-rename-input-function-rename":
-                try:
-                    # IRN response format: "iixxxxxxxxxx" where ii=input_id, xxxxxxxxxx=name
-                    if isinstance(value, str) and len(value) >= 2:
-                        input_id = value[:2]
-                        custom_name = value[2:].strip()
-                        
-                        if custom_name:  # Only store non-empty names
-                            custom_names[input_id] = custom_name
-                            _LOGGER.debug(f"Found custom name for input {input_id}: {custom_name}")
-                            
-                except Exception as e:
-                    _LOGGER.debug(f"Error parsing IRN response: {e}")
-    
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + timeout
+
+    custom_names: dict[str, str] = {}
+    receiver: Receiver | None = None
     try:
-        # Create connection
-        conn = await pyeiscp.Connection.create(
-            host=host,
-            port=port,
-            connect_callback=on_connect,
-            update_callback=on_update,
-            auto_connect=False
-        )
-        
-        await conn.connect()
-        await asyncio.sleep(0.5)  # Wait for connection to establish
-        
-        # Query input names for common input sources
-        common_inputs = ['00', '01', '02', '03', '04', '05', '10', '23', '24', '25', '26']
-        
-        for input_id in common_inputs:
-            try:
-                # Send IRN command with just the input ID to query
-                conn.send("main", "IRN", input_id)
-                await asyncio.sleep(0.1)
-            except Exception as e:
-                _LOGGER.debug(f"Failed to query input {input_id}: {e}")
-        
-        # Wait for responses
-        await asyncio.sleep(timeout)
-        
-        conn.close()
-        
+        receiver = await Receiver.async_create(ReceiverInfo(host, port, host, host))
+        if await receiver.async_connect(deadline - loop.time()):
+            custom_names = await receiver.async_query_custom_input_names(
+                deadline - loop.time(), input_ids
+            )
+
     except Exception as e:
         _LOGGER.debug(f"Failed to query custom input names from {host}: {e}")
-    
-    _LOGGER.debug(f"Found {len(custom_names)} custom input names")
+
+    finally:
+        if receiver is not None:
+            receiver.conn.close()
+
     return custom_names
 
 
+UpdateCallback = Callable[["Receiver", tuple[str, str, Any]], None]
+
+
+@dataclass
+class _InflightQuery:
+    """Query sent to the receiver, shared by everyone awaiting its answer."""
+
+    future: asyncio.Future[Any]
+    waiters: int = 0
+
+
+@dataclass
+class _CoalescedCommand:
+    """Send state of a latest-wins (zone, property)."""
+
+    last_sent: float
+    value: Any = None
+    handle: asyncio.TimerHandle | None = None
+
+
+@dataclass
+class _WarmUp:
+    """Set commands held while a zone powers on, latest value per property."""
+
+    handle: asyncio.TimerHandle
+    held: dict[str, tuple[Any, CommandPriority]] = field(default_factory=dict)
+    # The zone reported it is on, commands are held for the ready delay.
+    powered_on: bool = False
+
+
 @dataclass
 class Callbacks:
-    """Onkyo Receiver Callbacks."""
+    """Onkyo Receiver Callbacks.
+
+    `update` callbacks receive every message, `subscriptions` only the
+    messages for their (zone, command).
+    """
 
     connect: list[Callable[[Receiver], None]] = field(default_factory=list)
-    update: list[Callable[[Receiver, tuple[str, str, Any]], None]] = field(
-        default_factory=list
+    update: list[UpdateCallback] = field(default_factory=list)
+    subscriptions: dict[tuple[str, str], list[UpdateCallback]] = field(
+        default_factory=dict
     )
 
 
@@ -108,8 +329,38 @@ class Receiver:
     model_name: str
     identifier: str
     host: str
+    info: ReceiverInfo
     first_connect: bool = True
     callbacks: Callbacks = field(default_factory=Callbacks)
+    started: bool = False
+    custom_input_names: dict[str, str] = field(default_factory=dict)
+    # Zone availability, from the zone answering the power probe (or "N/A").
+    zones: dict[str, bool] = field(default_factory=dict)
+    heartbeat_interval: float = OPTION_HEARTBEAT_INTERVAL_DEFAULT
+    heartbeat_rtt: float | None = field(default=None, init=False)
+    missed_heartbeats: int = field(default=0, init=False)
+    reconnect_attempts: int = field(default=0, init=False)
+    _closed: bool = field(default=False, init=False, repr=False)
+    _heartbeat: asyncio.Task[None] | None = field(default=None, init=False, repr=False)
+    _reconnect: asyncio.Task[None] | None = field(default=None, init=False, repr=False)
+    _connected: asyncio.Event = field(
+        default_factory=asyncio.Event, init=False, repr=False
+    )
+    _irn_query: _PipelinedQuery | None = field(default=None, init=False, repr=False)
+    scheduler: CommandScheduler = field(
+        default_factory=CommandScheduler, init=False, repr=False
+    )
+    _coalesced: dict[tuple[str, str], _CoalescedCommand] = field(
+        default_factory=dict, init=False, repr=False
+    )
+    _queries: dict[tuple[str, str], _InflightQuery] = field(
+        default_factory=dict, init=False, repr=False
+    )
+    _powered: dict[str, bool] = field(default_factory=dict, init=False, repr=False)
+    _confirmed: dict[tuple[str, str], float] = field(
+        default_factory=dict, init=False, repr=False
+    )
+    _warmups: dict[str, _WarmUp] = field(default_factory=dict, init=False, repr=False)
 
     @classmethod
     async def async_create(cls, info: ReceiverInfo) -> Receiver:
@@ -125,13 +376,20 @@ class Receiver:
             assert receiver is not None
             receiver.on_update(message)
 
+        def on_disconnect(_origin: str) -> None:
+            assert receiver is not None
+            receiver.on_disconnect()
+
         _LOGGER.debug("Creating receiver: %s (%s)", info.model_name, info.host)
 
+        # Reconnecting is done by the receiver, with backoff and jitter.
         connection = await pyeiscp.Connection.create(
             host=info.host,
             port=info.port,
+            auto_reconnect=False,
             connect_callback=on_connect,
             update_callback=on_update,
+            disconnect_callback=on_disconnect,
             auto_connect=False,
         )
 
@@ -141,29 +399,425 @@ class Receiver:
                 model_name=info.model_name,
                 identifier=info.identifier,
                 host=info.host,
+                info=info,
             )
         )
 
+    @property
+    def connected(self) -> bool:
+        """Return if the connection to the receiver is established."""
+        return self.conn.protocol.transport is not None
+
+    async def async_connect(self, timeout: float) -> bool:
+        """Connect to the receiver, without starting normal operation.
+
+        Used by the interview, so that the connection can later be handed
+        over to `async_start` instead of opening another one.
+        """
+
+        async def _connect() -> None:
+            await self.conn.connect()
+            await self._connected.wait()
+
+        try:
+            await asyncio.wait_for(_connect(), timeout)
+        except asyncio.TimeoutError:
+            _LOGGER.debug("Timed out connecting to: %s", self.host)
+            return False
+        except Exception as e:
+            _LOGGER.debug(f"Failed to connect to {self.host}: {e}")
+            return False
+        return True
+
+    async def async_start(self) -> None:
+        """Start normal operation, reusing the interview connection if open."""
+        self.started = True
+        if self.connected:
+            self.on_connect()
+        else:
+            self._start_reconnect()
+
+    async def async_query_custom_input_names(
+        self, timeout: float = 5, input_ids: Iterable[str] = IRN_QUERY_INPUT_IDS
+    ) -> dict[str, str]:
+        """Query custom input names over the receiver connection.
+
+        Keeps a bounded number of IRN queries in flight and returns as soon
+        as every input has answered. Unanswered inputs are retried once,
+        after a timeout adapted to the measured round trip, and then given up on.
+        """
+        input_ids = list(input_ids)
+        self._irn_query = query = _PipelinedQuery(
+            lambda input_id: _send_raw(self.conn, f"IRN{input_id}"), input_ids
+        )
+        try:
+            await query.async_run(timeout)
+        finally:
+            self._irn_query = None
+
+        if query.missing:
+            _LOGGER.debug(f"No input name reply for inputs: {sorted(query.missing)}")
+        custom_names = {
+            input_id: self.custom_input_names[input_id]
+            for input_id in input_ids
+            if input_id in self.custom_input_names
+        }
+        _LOGGER.debug(f"Found {len(custom_names)} custom input names")
+        return custom_names
+
+    async def async_refresh_info(self) -> ReceiverInfo | None:
+        """Interview the receiver again, over the live connection.
+
+        Returns None if the receiver did not answer the discovery request,
+        or the connection is down.
+        """
+        if not self.connected:
+            return None
+        info = await _async_discover_host(self.host)
+        if info is None:
+            return None
+
+        try:
+            info.custom_input_names = await self.async_query_custom_input_names()
+        except ConnectionError as err:
+            _LOGGER.debug("Could not query custom input names: %s", err)
+            return None
+        self.info = info
+        return info
+
     def on_connect(self) -> None:
         """Receiver (re)connected."""
+        self._connected.set()
+        if not self.started:
+            _LOGGER.debug("Receiver connected for interview: %s", self.host)
+            return
+
         _LOGGER.debug("Receiver (re)connected: %s (%s)", self.model_name, self.host)
 
         # Discover what zones are available for the receiver by querying the power.
         # If we get a response for the specific zone, it means it is available.
+        # Zones that answered in a previous session are not probed again.
         for zone in ZONES:
-            self.conn.query_property(zone, "power")
+            if zone not in self.zones:
+                self.query_property(zone, "power")
 
-        for callback in self.callbacks.connect:
+        # A copy, callbacks may remove themselves.
+        for callback in tuple(self.callbacks.connect):
             callback(self)
 
         self.first_connect = False
 
+        if self.heartbeat_interval and self._heartbeat is None:
+            self._heartbeat = asyncio.get_running_loop().create_task(
+                self._async_heartbeat()
+            )
+
+    def on_disconnect(self) -> None:
+        """Receiver disconnected."""
+        self._connected.clear()
+        self._stop_heartbeat()
+        if self._closed or not self.started:
+            return
+        _LOGGER.debug("Receiver disconnected: %s (%s)", self.model_name, self.host)
+        self._start_reconnect()
+
+    def _stop_heartbeat(self) -> None:
+        if self._heartbeat is not None:
+            self._heartbeat.cancel()
+            self._heartbeat = None
+
+    async def _async_heartbeat(self) -> None:
+        """Query the main zone power periodically, reconnect if it goes unanswered.
+
+        A silently dropped connection otherwise looks alive until the TCP
+        timeout, which takes minutes.
+        """
+        loop = asyncio.get_running_loop()
+        self.missed_heartbeats = 0
+        interval = self.heartbeat_interval
+        while True:
+            await asyncio.sleep(interval)
+            start = loop.time()
+            try:
+                await self.async_query("main", "power", HEARTBEAT_TIMEOUT)
+            except TimeoutError:
+                self.missed_heartbeats += 1
+                _LOGGER.debug(
+                    "Missed heartbeat %d from %s", self.missed_heartbeats, self.host
+                )
+                if self.missed_heartbeats >= HEARTBEAT_MISSED_BEATS:
+                    break
+                # Confirm soon, rather than a full interval later.
+                interval = HEARTBEAT_RETRY_INTERVAL
+                continue
+            self.heartbeat_rtt = loop.time() - start
+            self.missed_heartbeats = 0
+            interval = self.heartbeat_interval
+
+        _LOGGER.warning(
+            "Receiver %s (%s) stopped answering, reconnecting",
+            self.model_name,
+            self.host,
+        )
+        self._heartbeat = None
+        if (transport := self.conn.protocol.transport) is not None:
+            # Reported back through on_disconnect, which reconnects.
+            transport.abort()
+
+    def _start_reconnect(self) -> None:
+        if self._reconnect is None:
+            self._reconnect = asyncio.get_running_loop().create_task(
+                self._async_reconnect()
+            )
+
+    async def _async_reconnect(self) -> None:
+        """Reconnect with jittered exponential backoff, until connected or closed."""
+        loop = asyncio.get_running_loop()
+        delay = RECONNECT_DELAY_MIN
+        try:
+            while not self._closed and not self.connected:
+                await asyncio.sleep(random.uniform(delay / 2, delay))
+                self.reconnect_attempts += 1
+                try:
+                    # Not conn.connect(), its own retry loop does not back off.
+                    async with asyncio.timeout(RECONNECT_TIMEOUT):
+                        await loop.create_connection(
+                            lambda: self.conn.protocol, self.conn.host, self.conn.port
+                        )
+                except OSError as err:  # Including TimeoutError.
+                    _LOGGER.debug("Reconnecting to %s failed: %s", self.host, err)
+                    delay = min(RECONNECT_DELAY_MAX, delay * 2)
+        finally:
+            self._reconnect = None
+
+    def close(self) -> None:
+        """Close the connection, dropping commands not sent yet."""
+        self._closed = True
+        self._stop_heartbeat()
+        if self._reconnect is not None:
+            self._reconnect.cancel()
+            self._reconnect = None
+        for command in self._coalesced.values():
+            if command.handle is not None:
+                command.handle.cancel()
+        self._coalesced.clear()
+        for query in self._queries.values():
+            query.future.cancel()
+        self._queries.clear()
+        for warmup in self._warmups.values():
+            warmup.handle.cancel()
+        self._warmups.clear()
+        self.scheduler.clear()
+        self.conn.close()
+
+    def is_fresh(self, zone: str, propname: str, max_age: float) -> bool:
+        """Return if the receiver reported the property within max_age seconds."""
+        confirmed = self._confirmed.get(_response_key(zone, propname))
+        return (
+            confirmed is not None
+            and asyncio.get_running_loop().time() - confirmed < max_age
+        )
+
+    def update_property(
+        self,
+        zone: str,
+        propname: str,
+        value: Any,
+        priority: CommandPriority = CommandPriority.USER,
+    ) -> None:
+        """Set a property, through the command scheduler.
+
+        The command is resent until the receiver echoes the value it set,
+        unless it steps or toggles the property. While the zone powers on,
+        the command is held until the zone is ready.
+        """
+        response_key = _response_key(zone, propname)
+        if response_key[1] in POWER_COMMANDS:
+            if value == "on" and self._powered.get(zone) is not True:
+                self._start_warmup(zone)
+        elif (warmup := self._warmups.get(zone)) is not None:
+            warmup.held[propname] = (value, priority)
+            return
+
+        relative = isinstance(value, str) and value in RELATIVE_VALUES
+        self.scheduler.submit(
+            lambda: self.conn.update_property(zone, propname, value),
+            priority,
+            ack_key=None if relative else response_key,
+            ack_value=value,
+        )
+
+    def _start_warmup(self, zone: str) -> None:
+        """Hold set commands for the zone until it reports it is on."""
+        if zone in self._warmups:
+            return
+        _LOGGER.debug("Zone %s powering on, holding commands", zone)
+        self._warmups[zone] = _WarmUp(
+            asyncio.get_running_loop().call_later(
+                POWER_ON_WARMUP_TIMEOUT, self._end_warmup, zone
+            )
+        )
+
+    def _hold_warmup(self, zone: str) -> None:
+        """Hold set commands for the zone that powered on until it is ready."""
+        handle = asyncio.get_running_loop().call_later(
+            POWER_ON_READY_DELAY, self._end_warmup, zone
+        )
+        if (warmup := self._warmups.get(zone)) is None:
+            _LOGGER.debug("Zone %s powered on, holding commands", zone)
+            warmup = self._warmups[zone] = _WarmUp(handle)
+        else:
+            warmup.handle.cancel()
+            warmup.handle = handle
+        warmup.powered_on = True
+
+    def _end_warmup(self, zone: str, *, flush: bool = True) -> None:
+        """Send the commands held while the zone powered on, as one paced burst."""
+        if (warmup := self._warmups.pop(zone, None)) is None:
+            return
+        warmup.handle.cancel()
+        if not flush:
+            _LOGGER.debug("Zone %s powered off, dropping held commands", zone)
+            return
+        _LOGGER.debug("Zone %s ready, sending %d held commands", zone, len(warmup.held))
+        for propname, (value, priority) in warmup.held.items():
+            self.update_property(zone, propname, value, priority)
+
+    def query_property(
+        self,
+        zone: str,
+        propname: str,
+        priority: CommandPriority = CommandPriority.BACKGROUND,
+    ) -> None:
+        """Query a property, through the command scheduler."""
+        self.scheduler.submit(lambda: self.conn.query_property(zone, propname), priority)
+
+    async def async_query(
+        self,
+        zone: str,
+        propname: str,
+        timeout: float = QUERY_TIMEOUT,
+        priority: CommandPriority = CommandPriority.BACKGROUND,
+    ) -> Any:
+        """Query a property and return the value the receiver answers with.
+
+        Concurrent queries for the same property share one request. Raises
+        TimeoutError if no answer arrives within the timeout.
+        """
+        key = _response_key(zone, propname)
+        query = self._queries.get(key)
+        if query is None:
+            query = self._queries[key] = _InflightQuery(
+                asyncio.get_running_loop().create_future()
+            )
+            self.query_property(zone, propname, priority)
+
+        query.waiters += 1
+        try:
+            return await asyncio.wait_for(asyncio.shield(query.future), timeout)
+        finally:
+            query.waiters -= 1
+            if not query.waiters and not query.future.done():
+                # Nobody is waiting anymore, a later query sends a new request.
+                query.future.cancel()
+                if self._queries.get(key) is query:
+                    del self._queries[key]
+
+    def update_property_coalesced(self, zone: str, propname: str, value: Any) -> None:
+        """Set a property, replacing any value still waiting to be sent.
+
+        Sends at most one command per COALESCED_COMMAND_INTERVAL for the
+        (zone, property); values set in between replace each other, so only
+        the newest one goes out when the interval has passed.
+        """
+        loop = asyncio.get_running_loop()
+        now = loop.time()
+        key = (zone, propname)
+        command = self._coalesced.get(key)
+
+        if command is None or (
+            command.handle is None
+            and now - command.last_sent >= COALESCED_COMMAND_INTERVAL
+        ):
+            self._coalesced[key] = _CoalescedCommand(last_sent=now)
+            self.update_property(zone, propname, value)
+            return
+
+        command.value = value
+        if command.handle is None:
+            command.handle = loop.call_at(
+                command.last_sent + COALESCED_COMMAND_INTERVAL,
+                self._send_coalesced,
+                key,
+            )
+
+    def _send_coalesced(self, key: tuple[str, str]) -> None:
+        """Send the newest value of a latest-wins property."""
+        command = self._coalesced[key]
+        command.handle = None
+        command.last_sent = asyncio.get_running_loop().time()
+        zone, propname = key
+        self.update_property(zone, propname, command.value)
+
+    def subscribe(
+        self, zone: str, commands: Iterable[str], callback: UpdateCallback
+    ) -> Callable[[], None]:
+        """Subscribe to messages for the given zone and commands.
+
+        Returns a function that removes the subscription.
+        """
+        keys = [(zone, command) for command in commands]
+        for key in keys:
+            self.callbacks.subscriptions.setdefault(key, []).append(callback)
+
+        def unsubscribe() -> None:
+            for key in keys:
+                callbacks = self.callbacks.subscriptions[key]
+                callbacks.remove(callback)
+                if not callbacks:
+                    del self.callbacks.subscriptions[key]
+
+        return unsubscribe
+
     def on_update(self, message: tuple[str, str, Any]) -> None:
         """Process new message from the receiver."""
         _LOGGER.debug("Received update callback from %s: %s", self.model_name, message)
+        if (reply := _parse_irn_reply(message)) is not None:
+            input_id, custom_name = reply
+            if custom_name:  # Only store non-empty names
+                self.custom_input_names[input_id] = custom_name
+                _LOGGER.debug(f"Found custom name for input {input_id}: {custom_name}")
+            if self._irn_query is not None:
+                self._irn_query.on_reply(input_id)
+            return
+
         for callback in self.callbacks.update:
             callback(self, message)
 
+        zone, command, value = message
+        self._confirmed[(zone, command)] = asyncio.get_running_loop().time()
+        self.scheduler.acknowledge((zone, command), value)
+        if command in POWER_COMMANDS:
+            self.zones[zone] = value != "N/A"
+            powered = value == "on"
+            was_powered = self._powered.get(zone)
+            self._powered[zone] = powered
+            if not powered:
+                self._end_warmup(zone, flush=False)
+            elif was_powered is False:
+                # Powered on, by us, the remote or another controller. The
+                # status burst that follows does not mean it accepts commands.
+                self._hold_warmup(zone)
+            elif (warmup := self._warmups.get(zone)) and not warmup.powered_on:
+                # The zone was on already, nothing to wait for.
+                self._end_warmup(zone)
+        if self._queries and (query := self._queries.pop((zone, command), None)):
+            if not query.future.done():
+                query.future.set_result(value)
+
+        for callback in self.callbacks.subscriptions.get((zone, command), ()):
+            callback(self, message)
+
 
 @dataclass
 class ReceiverInfo:
@@ -175,60 +829,115 @@ class ReceiverInfo:
     identifier: str
     custom_input_names: dict[str, str] = field(default_factory=dict)
 
+    def as_dict(self) -> dict[str, Any]:
+        """Return the information in a form that can be stored."""
+        return asdict(self)
 
-async def async_interview(host: str) -> ReceiverInfo | None:
-    """Interview Onkyo Receiver."""
-    _LOGGER.debug("Interviewing receiver: %s", host)
+    @classmethod
+    def from_dict(cls, data: Mapping[str, Any]) -> ReceiverInfo | None:
+        """Restore stored information, None if it is not in the current form."""
+        try:
+            return cls(**data)
+        except TypeError:
+            return None
 
-    receiver_info: ReceiverInfo | None = None
 
-    event = asyncio.Event()
+async def _async_discover_host(host: str) -> ReceiverInfo | None:
+    """Identify the Onkyo Receiver at the given host."""
+    async for info in async_iter_discover(
+        host=host, timeout=DEVICE_INTERVIEW_TIMEOUT, expected_count=1
+    ):
+        # Keep the host as given (e.g. a hostname), not the reply's address.
+        return replace(info, host=host)
+    return None
 
-    async def _callback(conn: pyeiscp.Connection) -> None:
-        """Receiver interviewed, connection not yet active."""
-        nonlocal receiver_info
-        if receiver_info is None:
-            # Query custom input names
-            custom_names = {}
-            try:
-                custom_names = await async_query_custom_input_names(host, conn.port)
-            except Exception as e:
-                _LOGGER.debug(f"Could not query custom input names: {e}")
-            
-            info = ReceiverInfo(host, conn.port, conn.name, conn.identifier, custom_names)
-            _LOGGER.debug("Receiver interviewed: %s (%s), found %d custom input names", 
-                         info.model_name, info.host, len(custom_names))
-            receiver_info = info
-            event.set()
-
-    timeout = DEVICE_INTERVIEW_TIMEOUT
 
-    await pyeiscp.Connection.discover(
-        host=host, discovery_callback=_callback, timeout=timeout
-    )
+async def async_interview_receiver(host: str) -> Receiver | None:
+    """Interview Onkyo Receiver, keeping the connection open.
+
+    The returned receiver is connected but not started, so the interview
+    connection can be handed over with `Receiver.async_start`.
+    """
+    _LOGGER.debug("Interviewing receiver: %s", host)
 
-    with contextlib.suppress(asyncio.TimeoutError):
-        await asyncio.wait_for(event.wait(), timeout)
+    receiver_info = await _async_discover_host(host)
+    if receiver_info is None:
+        return None
 
-    return receiver_info
+    receiver = await Receiver.async_create(receiver_info)
+    if not await receiver.async_connect(DEVICE_INTERVIEW_TIMEOUT):
+        receiver.conn.close()
+        return None
 
+    # Query custom input names
+    try:
+        receiver_info.custom_input_names = (
+            await receiver.async_query_custom_input_names()
+        )
+    except Exception as e:
+        _LOGGER.debug(f"Could not query custom input names: {e}")
 
-async def async_discover() -> Iterable[ReceiverInfo]:
-    """Discover Onkyo Receivers."""
+    _LOGGER.debug("Receiver interviewed: %s (%s), found %d custom input names",
+                 receiver_info.model_name, receiver_info.host,
+                 len(receiver_info.custom_input_names))
+    return receiver
+
+
+async def async_interview(host: str) -> ReceiverInfo | None:
+    """Interview Onkyo Receiver."""
+    receiver = await async_interview_receiver(host)
+    if receiver is None:
+        return None
+
+    receiver.conn.close()
+    return receiver.info
+
+
+async def async_iter_discover(
+    *,
+    host: str | None = None,
+    timeout: float = DEVICE_DISCOVERY_TIMEOUT,
+    expected_count: int | None = None,
+    identifier: str | None = None,
+    quiet_period: float | None = None,
+) -> AsyncIterator[ReceiverInfo]:
+    """Discover Onkyo Receivers, yielding each one as soon as it replies.
+
+    Discovery ends when the timeout expires, or earlier once the expected
+    number of receivers replied, the receiver with the wanted identifier
+    replied, or no further reply arrived for the quiet period.
+    """
     _LOGGER.debug("Discovering receivers")
 
-    receiver_infos: list[ReceiverInfo] = []
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + timeout
+    queue: asyncio.Queue[ReceiverInfo] = asyncio.Queue()
 
     async def _callback(conn: pyeiscp.Connection) -> None:
         """Receiver discovered, connection not yet active."""
         info = ReceiverInfo(conn.host, conn.port, conn.name, conn.identifier)
         _LOGGER.debug("Receiver discovered: %s (%s)", info.model_name, info.host)
-        receiver_infos.append(info)
+        queue.put_nowait(info)
+
+    await pyeiscp.Connection.discover(
+        host=host, discovery_callback=_callback, timeout=timeout
+    )
 
-    timeout = DEVICE_DISCOVERY_TIMEOUT
+    count = 0
+    wait_until = deadline
+    while (remaining := wait_until - loop.time()) > 0:
+        try:
+            info = await asyncio.wait_for(queue.get(), remaining)
+        except asyncio.TimeoutError:
+            break
 
-    await pyeiscp.Connection.discover(discovery_callback=_callback, timeout=timeout)
+        yield info
 
-    await asyncio.sleep(timeout)
+        count += 1
+        if expected_count is not None and count >= expected_count:
+            break
+        if identifier is not None and info.identifier == identifier:
+            break
+        if quiet_period is not None:
+            wait_until = min(deadline, loop.time() + quiet_period)
 
-    return receiver_infos
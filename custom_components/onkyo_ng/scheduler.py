@@ -0,0 +1,297 @@
+"""Rate limited, prioritized sending of commands to an Onkyo receiver."""
+
+from __future__ import annotations
+
+import asyncio
+from collections import deque
+from collections.abc import Callable, Hashable
+from dataclasses import dataclass
+from enum import IntEnum
+import functools
+import logging
+from typing import Any
+
+_LOGGER = logging.getLogger(__name__)
+
+# Onkyo receivers drop commands when they arrive too fast, so commands are
+# sent at most at this rate (per second), with bursts of up to this many.
+COMMAND_RATE = 20
+COMMAND_BURST = 10
+
+# Set commands are acknowledged by the receiver echoing the value they set.
+# An unacknowledged command is resent after ACK_TIMEOUT, doubling each
+# attempt, until ACK_ATTEMPTS sends or ACK_DEADLINE seconds after the first send.
+ACK_TIMEOUT = 0.5
+ACK_ATTEMPTS = 3
+ACK_DEADLINE = 3.0
+# Number of recent acknowledgement latencies kept for the percentiles.
+ACK_LATENCY_SAMPLES = 200
+
+
+class CommandPriority(IntEnum):
+    """Command priority lanes, lower values are sent first."""
+
+    USER = 0
+    BACKGROUND = 1
+
+
+@dataclass
+class LaneMetrics:
+    """Queue metrics of one priority lane."""
+
+    sent: int = 0
+    queued: int = 0
+    max_depth: int = 0
+    total_wait: float = 0.0
+    max_wait: float = 0.0
+
+    def as_dict(self, depth: int) -> dict[str, Any]:
+        """Return the metrics for diagnostics."""
+        return {
+            "depth": depth,
+            "max_depth": self.max_depth,
+            "sent": self.sent,
+            "queued": self.queued,
+            "average_wait": self.total_wait / self.queued if self.queued else 0.0,
+            "max_wait": self.max_wait,
+        }
+
+
+@dataclass
+class _PendingAck:
+    """Set command waiting for the receiver to echo its status."""
+
+    send: Callable[[], None]
+    value: Any
+    first_sent: float
+    last_sent: float = 0.0
+    attempts: int = 0
+    handle: asyncio.TimerHandle | None = None
+
+
+@dataclass
+class AckMetrics:
+    """Acknowledgement metrics of set commands."""
+
+    acknowledged: int = 0
+    retried: int = 0
+    failed: int = 0
+
+    def as_dict(self, pending: int, latencies: list[float]) -> dict[str, Any]:
+        """Return the metrics for diagnostics."""
+        return {
+            "pending": pending,
+            "acknowledged": self.acknowledged,
+            "retried": self.retried,
+            "failed": self.failed,
+            "latency_p50": _percentile(latencies, 0.5),
+            "latency_p90": _percentile(latencies, 0.9),
+            "latency_p99": _percentile(latencies, 0.99),
+        }
+
+
+def _echo_matches(sent: Any, echoed: Any) -> bool:
+    """Return if an echoed status confirms the value that was sent.
+
+    pyeiscp decodes values with aliases to a tuple of names, and numeric
+    values to int. "N/A" means the receiver rejected the command, resending
+    it would not help.
+    """
+    if echoed == sent or echoed == "N/A":
+        return True
+    if isinstance(echoed, tuple):
+        return sent in echoed
+    if isinstance(echoed, int) and isinstance(sent, str) and sent.isdigit():
+        return int(sent) == echoed
+    return False
+
+
+def _percentile(values: list[float], fraction: float) -> float | None:
+    """Return the nearest-rank percentile of sorted values."""
+    if not values:
+        return None
+    return values[min(len(values) - 1, int(fraction * len(values)))]
+
+
+class CommandScheduler:
+    """Token bucket rate limiter with a queue per priority lane.
+
+    A command is sent right away while tokens are available and nothing is
+    queued; otherwise it waits in its lane. Queued commands are sent highest
+    priority first, so user commands never wait behind background queries.
+
+    Commands submitted with an acknowledgement key are resent, with backoff,
+    until `acknowledge` is called for the key with the value they set, or
+    they run out of attempts.
+    """
+
+    def __init__(self, rate: float = COMMAND_RATE, burst: int = COMMAND_BURST) -> None:
+        """Initialize the scheduler."""
+        self._rate = rate
+        self._burst = burst
+        self._tokens = float(burst)
+        self._updated: float | None = None
+        self._lanes: dict[CommandPriority, deque[tuple[float, Callable[[], None]]]] = {
+            priority: deque() for priority in CommandPriority
+        }
+        self._metrics = {priority: LaneMetrics() for priority in CommandPriority}
+        self._handle: asyncio.TimerHandle | None = None
+        self._acks: dict[Hashable, _PendingAck] = {}
+        self._ack_latencies: deque[float] = deque(maxlen=ACK_LATENCY_SAMPLES)
+        self._ack_metrics = AckMetrics()
+
+    def _refill(self, now: float) -> None:
+        if self._updated is not None:
+            self._tokens = min(
+                self._burst, self._tokens + (now - self._updated) * self._rate
+            )
+        self._updated = now
+
+    def submit(
+        self,
+        send: Callable[[], None],
+        priority: CommandPriority = CommandPriority.USER,
+        ack_key: Hashable | None = None,
+        ack_value: Any = None,
+    ) -> None:
+        """Send a command now if the rate allows, otherwise queue it.
+
+        With an `ack_key`, the command is resent until the `ack_value` it
+        sets is acknowledged. A newer command with the same key replaces one
+        still waiting for its ack.
+        """
+        if ack_key is not None:
+            send = functools.partial(self._send_acked, ack_key, ack_value, send)
+
+        now = asyncio.get_running_loop().time()
+        self._refill(now)
+
+        if self._tokens >= 1 and not any(self._lanes.values()):
+            self._tokens -= 1
+            self._metrics[priority].sent += 1
+            send()
+            return
+
+        lane = self._lanes[priority]
+        lane.append((now, send))
+        metrics = self._metrics[priority]
+        metrics.max_depth = max(metrics.max_depth, len(lane))
+        self._schedule()
+
+    def _schedule(self) -> None:
+        if self._handle is not None:
+            return
+        loop = asyncio.get_running_loop()
+        delay = max(0.0, (1 - self._tokens) / self._rate)
+        self._handle = loop.call_later(delay, self._drain)
+
+    def _drain(self) -> None:
+        """Send queued commands while tokens are available."""
+        self._handle = None
+        now = asyncio.get_running_loop().time()
+        self._refill(now)
+
+        for priority, lane in self._lanes.items():
+            metrics = self._metrics[priority]
+            while lane and self._tokens >= 1:
+                queued_at, send = lane.popleft()
+                self._tokens -= 1
+                wait = now - queued_at
+                metrics.sent += 1
+                metrics.queued += 1
+                metrics.total_wait += wait
+                metrics.max_wait = max(metrics.max_wait, wait)
+                try:
+                    send()
+                except Exception:
+                    _LOGGER.exception("Error sending queued command")
+
+        if any(self._lanes.values()):
+            self._schedule()
+
+    def _send_acked(
+        self, key: Hashable, value: Any, send: Callable[[], None]
+    ) -> None:
+        """Send a command and start waiting for its acknowledgement."""
+        if (superseded := self._acks.get(key)) is not None and superseded.handle:
+            superseded.handle.cancel()
+        pending = self._acks[key] = _PendingAck(
+            send, value, first_sent=asyncio.get_running_loop().time()
+        )
+        self._send_attempt(key, pending)
+
+    def _send_attempt(self, key: Hashable, pending: _PendingAck) -> None:
+        loop = asyncio.get_running_loop()
+        pending.send()
+        pending.last_sent = loop.time()
+        pending.handle = loop.call_later(
+            ACK_TIMEOUT * 2**pending.attempts, self._ack_expired, key, pending
+        )
+        pending.attempts += 1
+
+    def _ack_expired(self, key: Hashable, pending: _PendingAck) -> None:
+        """Resend an unacknowledged command, or give up on it."""
+        pending.handle = None
+        if self._acks.get(key) is not pending:
+            return
+
+        now = asyncio.get_running_loop().time()
+        if pending.attempts >= ACK_ATTEMPTS or now - pending.first_sent >= ACK_DEADLINE:
+            del self._acks[key]
+            self._ack_metrics.failed += 1
+            _LOGGER.debug(
+                "Command %s not acknowledged after %d attempts", key, pending.attempts
+            )
+            return
+
+        self._ack_metrics.retried += 1
+        self.submit(functools.partial(self._retry, key, pending))
+
+    def _retry(self, key: Hashable, pending: _PendingAck) -> None:
+        # Acknowledged or replaced while waiting in the queue.
+        if self._acks.get(key) is pending:
+            self._send_attempt(key, pending)
+
+    def acknowledge(self, key: Hashable, value: Any) -> None:
+        """Acknowledge the command waiting for this key, if value confirms it.
+
+        Other values, e.g. the old status answering a query, leave the
+        command waiting.
+        """
+        if (pending := self._acks.get(key)) is None or not _echo_matches(
+            pending.value, value
+        ):
+            return
+        del self._acks[key]
+        if pending.handle is not None:
+            pending.handle.cancel()
+        self._ack_metrics.acknowledged += 1
+        # From the first send, so that retries show in the latency.
+        self._ack_latencies.append(
+            asyncio.get_running_loop().time() - pending.first_sent
+        )
+
+    def clear(self) -> None:
+        """Drop all queued commands."""
+        if self._handle is not None:
+            self._handle.cancel()
+            self._handle = None
+        for lane in self._lanes.values():
+            lane.clear()
+        for pending in self._acks.values():
+            if pending.handle is not None:
+                pending.handle.cancel()
+        self._acks.clear()
+
+    def metrics(self) -> dict[str, Any]:
+        """Return queue depth and wait time metrics per lane, and ack metrics."""
+        metrics = {
+            priority.name.lower(): self._metrics[priority].as_dict(
+                len(self._lanes[priority])
+            )
+            for priority in CommandPriority
+        }
+        metrics["acks"] = self._ack_metrics.as_dict(
+            len(self._acks), sorted(self._ack_latencies)
+        )
+        return metrics
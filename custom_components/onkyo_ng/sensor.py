@@ -0,0 +1,150 @@
+"""Audio and video information sensors for Onkyo receivers."""
+
+from __future__ import annotations
+
+import contextlib
+from typing import Any
+
+from homeassistant.components.sensor import SensorEntity
+from homeassistant.const import EntityCategory
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.entity_platform import AddEntitiesCallback
+
+from . import OnkyoConfigEntry
+from .av_information import AUDIO_INFORMATION_MAPPING, VIDEO_INFORMATION_MAPPING
+from .const import CONF_RECEIVER_INFORMATION
+from .receiver import POWER_COMMANDS, Receiver
+
+# Only the main zone reports audio and video information.
+ZONE = "main"
+
+INFORMATION_FIELDS = {
+    "audio-information": AUDIO_INFORMATION_MAPPING,
+    "video-information": VIDEO_INFORMATION_MAPPING,
+}
+
+# Fields enabled by default, the others can be enabled in the entity settings.
+ENABLED_FIELDS = frozenset(
+    {
+        "input_signal_format",
+        "input_frequency",
+        "input_channels",
+        "output_channels",
+        "input_resolution",
+        "output_resolution",
+    }
+)
+
+
+async def async_setup_entry(
+    hass: HomeAssistant,
+    entry: OnkyoConfigEntry,
+    async_add_entities: AddEntitiesCallback,
+) -> None:
+    """Set up audio and video information sensors for config entry."""
+    receiver = entry.runtime_data.receiver
+    commands: set[str] = set()
+
+    def create_sensors(command: str, value: Any = None) -> list[OnkyoInformationSensor]:
+        commands.add(command)
+        return [
+            OnkyoInformationSensor(receiver, command, index, field, value)
+            for index, field in enumerate(INFORMATION_FIELDS[command])
+        ]
+
+    # Create the sensors of the information reported before right away, the
+    # others once the receiver reports it, not every model does.
+    stored_commands = entry.data.get(CONF_RECEIVER_INFORMATION, {})
+    async_add_entities(
+        [
+            sensor
+            for command in stored_commands.get(receiver.identifier, ())
+            if command in INFORMATION_FIELDS
+            for sensor in create_sensors(command)
+        ]
+    )
+
+    def update_callback(receiver: Receiver, message: tuple[str, str, Any]) -> None:
+        zone, command, value = message
+        if (
+            zone != ZONE
+            or command not in INFORMATION_FIELDS
+            or command in commands
+            or value == "N/A"
+        ):
+            return
+        async_add_entities(create_sensors(command, value))
+        hass.config_entries.async_update_entry(
+            entry,
+            data={
+                **entry.data,
+                CONF_RECEIVER_INFORMATION: {receiver.identifier: sorted(commands)},
+            },
+        )
+
+    receiver.callbacks.update.append(update_callback)
+
+
+class OnkyoInformationSensor(SensorEntity):
+    """One field of the audio (IFA) or video (IFV) information."""
+
+    _attr_should_poll = False
+    _attr_entity_category = EntityCategory.DIAGNOSTIC
+
+    def __init__(
+        self,
+        receiver: Receiver,
+        command: str,
+        index: int,
+        field: str,
+        value: Any = None,
+    ) -> None:
+        """Initialize the sensor, with the information that revealed it if any."""
+        self._receiver = receiver
+        self._command = command
+        self._index = index
+        self._attr_native_value = self._field(value)
+        self._attr_name = f"{receiver.model_name} {field.replace('_', ' ').capitalize()}"
+        self._attr_unique_id = f"{receiver.identifier}_{ZONE}_{field}"
+        self._attr_entity_registry_enabled_default = field in ENABLED_FIELDS
+
+    async def async_added_to_hass(self) -> None:
+        """Subscribe to the information, and get the current one."""
+        self.async_on_remove(
+            self._receiver.subscribe(
+                ZONE, [self._command, *POWER_COMMANDS], self._on_message
+            )
+        )
+        # Otherwise the main zone queries it once connected.
+        if self._receiver.connected and self._attr_native_value is None:
+            self.hass.async_create_background_task(
+                self._async_query(), f"{self.entity_id} query {self._command}"
+            )
+
+    async def _async_query(self) -> None:
+        # Sensors of the same message share one query, the answer arrives
+        # through the subscription.
+        with contextlib.suppress(TimeoutError):
+            await self._receiver.async_query(ZONE, self._command)
+
+    @callback
+    def _on_message(self, receiver: Receiver, message: tuple[str, str, Any]) -> None:
+        """Update the state, only if the field changed."""
+        _, command, value = message
+        if command != self._command:
+            # Power messages, the information goes away in standby.
+            if value == "on":
+                return
+            value = None
+        else:
+            value = self._field(value)
+
+        if value != self._attr_native_value:
+            self._attr_native_value = value
+            self.async_write_ha_state()
+
+    def _field(self, value: Any) -> str | None:
+        """Return this sensor's field of the information, None if empty."""
+        if isinstance(value, tuple) and self._index < len(value):
+            return value[self._index] or None
+        return None
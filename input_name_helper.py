@@ -5,8 +5,8 @@ Helper functions for querying custom input names from Onkyo receivers.
 import asyncio
 import logging
 from typing import Dict, Optional
-import pyeiscp
 from custom_components.onkyo_ng.const import InputSource
+from custom_components.onkyo_ng.receiver import async_query_custom_input_names
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -14,6 +14,10 @@ async def query_custom_input_names(host: str, port: int = 60128, timeout: int =
     """
     Query custom input names from an Onkyo receiver.
     
+    All known input sources are queried through the integration's pipelined
+    IRN query, which keeps a bounded number of requests in flight and only
+    retries the inputs that did not answer.
+    
     Args:
         host: Receiver IP address
         port: Receiver port (default 60128)
@@ -23,86 +27,21 @@ async def query_custom_input_names(host: str, port: int = 60128, timeout: int =
         Dictionary mapping InputSource enums to their custom names
     """
     custom_names = {}
-    received_names = {}
-    
-    def on_connect(origin: str):
-        _LOGGER.debug(f"Connected to {origin} for input name query")
     
-    def on_update(message: tuple, origin: str):
-        """Process received messages looking for input rename responses."""
-        if len(message) >= 3:
-            zone, command, value = message[:3]
-            _LOGGER.debug(f"Received: zone={zone}, command={command}, value={value}")
-            
-            # Check if this is an IRN (Input Rename) response
-            if command == "input-selector-rename-input-function-rename":
-                try:
-                    # IRN response format: "iixxxxxxxxxx" where ii=input_id, xxxxxxxxxx=name
-                    if isinstance(value, str) and len(value) >= 2:
-                        input_id = value[:2]
-                        custom_name = value[2:].strip()
-                        
-                        if custom_name:  # Only store non-empty names
-                            received_names[input_id] = custom_name
-                            _LOGGER.debug(f"Found custom name for input {input_id}: {custom_name}")
-                            
-                except Exception as e:
-                    _LOGGER.debug(f"Error parsing IRN response: {e}")
+    received_names = await async_query_custom_input_names(
+        host,
+        port,
+        timeout,
+        input_ids=[input_source.value for input_source in InputSource],
+    )
     
-    try:
-        # Create connection
-        conn = await pyeiscp.Connection.create(
-            host=host,
-            port=port,
-            connect_callback=on_connect,
-            update_callback=on_update,
-            auto_connect=False
-        )
-        
-        await conn.connect()
-        await asyncio.sleep(1)  # Wait for connection to establish
-        
-        # Query input names for all known input sources
-        for input_source in InputSource:
-            try:
-                input_id = input_source.value
-                _LOGGER.debug(f"Querying custom name for input {input_id}")
-                
-                # Try different methods to query the input name
-                
-                # Method 1: Send IRN command with just the input ID
-                try:
-                    conn.send("main", "IRN", input_id)
-                    await asyncio.sleep(0.2)
-                except Exception as e:
-                    _LOGGER.debug(f"IRN send failed for {input_id}: {e}")
-                
-                # Method 2: Send IRN query using the full command name
-                try:
-                    conn.send("main", "input-selector-rename-input-function-rename", input_id)
-                    await asyncio.sleep(0.2)
-                except Exception as e:
-                    _LOGGER.debug(f"IRN full command failed for {input_id}: {e}")
-                    
-            except Exception as e:
-                _LOGGER.debug(f"Failed to query input {input_source}: {e}")
-                continue
-        
-        # Wait for responses
-        await asyncio.sleep(timeout)
-        
-        # Map received names to InputSource enums
-        for input_id, custom_name in received_names.items():
-            try:
-                input_source = InputSource(input_id)
-                custom_names[input_source] = custom_name
-            except ValueError:
-                _LOGGER.debug(f"Unknown input ID received: {input_id}")
-        
-        conn.close()
-        
-    except Exception as e:
-        _LOGGER.error(f"Failed to query custom input names: {e}")
+    # Map received names to InputSource enums
+    for input_id, custom_name in received_names.items():
+        try:
+            input_source = InputSource(input_id)
+            custom_names[input_source] = custom_name
+        except ValueError:
+            _LOGGER.debug(f"Unknown input ID received: {input_id}")
     
     _LOGGER.info(f"Found {len(custom_names)} custom input names")
     return custom_names
@@ -0,0 +1,304 @@
+#!/usr/bin/env python3
+"""
+Tests for the command scheduler and the receiver's coalescing, queries,
+acknowledgement of set commands and holding commands while powering on.
+
+Runs on an event loop with a virtual clock, so pacing and timeouts are
+exact and the tests do not wait in real time.
+
+Run with pytest, or directly: python test_command_scheduler.py
+"""
+
+import asyncio
+import selectors
+
+from custom_components.onkyo_ng.receiver import (
+    COALESCED_COMMAND_INTERVAL,
+    POWER_ON_READY_DELAY,
+    Receiver,
+    ReceiverInfo,
+    _response_key,
+)
+from custom_components.onkyo_ng.scheduler import (
+    ACK_TIMEOUT,
+    COMMAND_BURST,
+    COMMAND_RATE,
+    CommandPriority,
+    CommandScheduler,
+)
+
+
+class VirtualTimeSelector(selectors.DefaultSelector):
+    """Advances the virtual clock instead of blocking."""
+
+    def __init__(self):
+        super().__init__()
+        self.now = 0.0
+
+    def select(self, timeout=None):
+        if timeout is None:
+            raise RuntimeError("Nothing scheduled, the test would hang")
+        self.now += timeout
+        return super().select(0)
+
+
+class VirtualTimeLoop(asyncio.SelectorEventLoop):
+    """Event loop whose clock only moves when it would otherwise wait."""
+
+    def __init__(self):
+        self._selector_clock = VirtualTimeSelector()
+        super().__init__(self._selector_clock)
+
+    def time(self):
+        return self._selector_clock.now
+
+
+def run(coro):
+    loop = VirtualTimeLoop()
+    try:
+        return loop.run_until_complete(coro)
+    finally:
+        loop.close()
+
+
+class FakeConnection:
+    """Records the commands sent by a receiver, with the time they went out.
+
+    Set commands are echoed back after echo_delay, like a receiver reports
+    its new status; with echo_delay None they go unanswered.
+    """
+
+    def __init__(self, echo_delay=0.02):
+        self.echo_delay = echo_delay
+        self.receiver = None
+        self.sent = []
+        self.protocol = self
+        self.transport = self
+
+    def update_property(self, zone, propname, value):
+        loop = asyncio.get_running_loop()
+        self.sent.append((loop.time(), zone, propname, value))
+        if self.echo_delay is not None:
+            echo = (*_response_key(zone, propname), value)
+            loop.call_later(self.echo_delay, self.receiver.on_update, echo)
+
+    def query_property(self, zone, propname):
+        self.sent.append((asyncio.get_running_loop().time(), zone, propname, "query"))
+
+    def close(self):
+        self.transport = None
+
+
+def make_receiver(echo_delay=0.02) -> Receiver:
+    info = ReceiverInfo("192.0.2.1", 60128, "TX-NR609", "0009B0000000")
+    conn = FakeConnection(echo_delay)
+    conn.receiver = Receiver(
+        conn=conn,
+        model_name=info.model_name,
+        identifier=info.identifier,
+        host=info.host,
+        info=info,
+    )
+    return conn.receiver
+
+
+def test_burst_then_rate_limited():
+    """A burst goes out at once, the rest at the command rate, in order."""
+
+    async def scenario():
+        loop = asyncio.get_running_loop()
+        scheduler = CommandScheduler()
+        sent = []
+        for i in range(COMMAND_BURST + 5):
+            scheduler.submit(lambda i=i: sent.append((loop.time(), i)))
+        await asyncio.sleep(1)
+        return sent
+
+    sent = run(scenario())
+    assert [i for _, i in sent] == list(range(COMMAND_BURST + 5))
+    assert all(when == 0 for when, _ in sent[:COMMAND_BURST])
+    for n, (when, _) in enumerate(sent[COMMAND_BURST:], 1):
+        assert abs(when - n / COMMAND_RATE) < 1e-6, (n, when)
+
+
+def test_user_commands_go_before_background():
+    """Queued user commands are sent before background commands queued earlier."""
+
+    async def scenario():
+        scheduler = CommandScheduler()
+        sent = []
+        for _ in range(COMMAND_BURST):
+            scheduler.submit(lambda: None)
+        for i in range(3):
+            scheduler.submit(
+                lambda i=i: sent.append(f"background{i}"), CommandPriority.BACKGROUND
+            )
+        scheduler.submit(lambda: sent.append("user"), CommandPriority.USER)
+        await asyncio.sleep(1)
+        return sent, scheduler.metrics()
+
+    sent, metrics = run(scenario())
+    assert sent == ["user", "background0", "background1", "background2"]
+    assert metrics["user"]["queued"] == 1
+    assert metrics["background"]["max_depth"] == 3
+
+
+def test_coalesced_property_sends_latest_value():
+    """Values set while a send is pending replace each other, the newest wins."""
+
+    async def scenario():
+        receiver = make_receiver()
+        for volume in range(10, 15):
+            receiver.update_property_coalesced("main", "volume", volume)
+            await asyncio.sleep(0.01)
+        await asyncio.sleep(1)
+        receiver.close()
+        return receiver.conn.sent
+
+    sent = run(scenario())
+    assert [(when, value) for when, _, _, value in sent] == [
+        (0, 10),
+        (COALESCED_COMMAND_INTERVAL, 14),
+    ]
+
+
+def test_concurrent_queries_share_one_request():
+    """Queries for the same property share the request and its answer."""
+
+    async def scenario():
+        receiver = make_receiver()
+        first = asyncio.ensure_future(receiver.async_query("main", "volume"))
+        second = asyncio.ensure_future(receiver.async_query("main", "volume"))
+        await asyncio.sleep(0.1)
+        receiver.on_update(("main", "master-volume", 42))
+        return await first, await second, receiver.conn.sent
+
+    first, second, sent = run(scenario())
+    assert (first, second) == (42, 42)
+    assert [(propname, value) for _, _, propname, value in sent] == [
+        ("volume", "query")
+    ]
+
+
+def test_query_timeout_allows_new_request():
+    """An unanswered query times out, and the next query asks again."""
+
+    async def scenario():
+        receiver = make_receiver()
+        try:
+            await receiver.async_query("main", "volume", timeout=1)
+        except TimeoutError:
+            pass
+        else:
+            raise AssertionError("query did not time out")
+        second = asyncio.ensure_future(receiver.async_query("main", "volume"))
+        await asyncio.sleep(0.1)
+        receiver.on_update(("main", "master-volume", 40))
+        return await second, receiver.conn.sent
+
+    value, sent = run(scenario())
+    assert value == 40
+    assert [when for when, _, _, _ in sent] == [0, 1]
+
+
+def test_set_command_resent_until_echoed():
+    """A slow echo causes a resend, the latency counts from the first send."""
+
+    async def scenario():
+        receiver = make_receiver(echo_delay=0.6)
+        receiver.update_property("main", "volume", 40)
+        await asyncio.sleep(3)
+        return receiver.conn.sent, receiver.scheduler.metrics()["acks"]
+
+    sent, acks = run(scenario())
+    assert [(when, value) for when, _, _, value in sent] == [(0, 40), (ACK_TIMEOUT, 40)]
+    assert (acks["acknowledged"], acks["retried"], acks["failed"]) == (1, 1, 0)
+    assert abs(acks["latency_p50"] - 0.6) < 1e-6
+
+
+def test_relative_command_sent_once():
+    """Stepping the volume is never resent, that would step it twice."""
+
+    async def scenario():
+        receiver = make_receiver(echo_delay=0.6)
+        receiver.update_property("main", "volume", "level-up")
+        await asyncio.sleep(3)
+        return receiver.conn.sent, receiver.scheduler.metrics()["acks"]
+
+    sent, acks = run(scenario())
+    assert [value for _, _, _, value in sent] == ["level-up"]
+    assert acks["retried"] == 0
+
+
+def test_old_status_does_not_acknowledge():
+    """Only the echo of the value set acknowledges it, not the old status."""
+
+    async def scenario():
+        receiver = make_receiver(echo_delay=None)
+        loop = asyncio.get_running_loop()
+        receiver.update_property("main", "input-selector", "cbl")
+        # A query answered with the input selected before.
+        loop.call_later(0.1, receiver.on_update, ("main", "input-selector", "fm"))
+        loop.call_later(
+            0.6, receiver.on_update, ("main", "input-selector", ("video2", "cbl", "sat"))
+        )
+        await asyncio.sleep(3)
+        return receiver.conn.sent, receiver.scheduler.metrics()["acks"]
+
+    sent, acks = run(scenario())
+    assert [when for when, _, _, _ in sent] == [0, ACK_TIMEOUT]
+    assert (acks["acknowledged"], acks["failed"]) == (1, 0)
+
+
+def test_commands_held_until_powered_on_zone_is_ready():
+    """The status burst after power on does not end the hold, the ready delay does."""
+
+    async def scenario():
+        receiver = make_receiver()
+        loop = asyncio.get_running_loop()
+        receiver.on_update(("main", "system-power", "standby"))
+        receiver.update_property("main", "power", "on")
+        receiver.update_property("main", "input-selector", "cbl")
+        loop.call_later(0.05, receiver.on_update, ("main", "master-volume", 30))
+        await asyncio.sleep(5)
+        return receiver.conn.sent
+
+    sent = run(scenario())
+    assert [(when, propname) for when, _, propname, _ in sent] == [
+        (0, "power"),
+        (0.02 + POWER_ON_READY_DELAY, "input-selector"),
+    ]
+
+
+def test_commands_not_held_when_zone_was_on():
+    """Powering on a zone that turns out to be on already holds nothing."""
+
+    async def scenario():
+        receiver = make_receiver()
+        receiver.update_property("main", "power", "on")
+        receiver.update_property("main", "input-selector", "cbl")
+        await asyncio.sleep(5)
+        return receiver.conn.sent
+
+    sent = run(scenario())
+    assert [(when, propname) for when, _, propname, _ in sent] == [
+        (0, "power"),
+        (0.02, "input-selector"),
+    ]
+
+
+if __name__ == "__main__":
+    for test in (
+        test_burst_then_rate_limited,
+        test_user_commands_go_before_background,
+        test_coalesced_property_sends_latest_value,
+        test_concurrent_queries_share_one_request,
+        test_query_timeout_allows_new_request,
+        test_set_command_resent_until_echoed,
+        test_relative_command_sent_once,
+        test_old_status_does_not_acknowledge,
+        test_commands_held_until_powered_on_zone_is_ready,
+        test_commands_not_held_when_zone_was_on,
+    ):
+        test()
+        print(f"{test.__name__}: ok")
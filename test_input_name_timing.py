@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+"""
+Timing test for the custom input name query, run against a fake connection.
+
+Run with pytest, or directly: python test_input_name_timing.py
+"""
+
+import asyncio
+import time
+from unittest.mock import patch
+
+from pyeiscp.protocol import eISCPPacket
+
+from custom_components.onkyo_ng import receiver
+from custom_components.onkyo_ng.const import InputSource
+from custom_components.onkyo_ng.receiver import (
+    IRN_QUERY_ATTEMPTS,
+    IRN_QUERY_INPUT_IDS,
+    IRN_QUERY_WINDOW,
+    async_query_custom_input_names,
+)
+
+IRN_COMMAND = "input-selector-rename-input-function-rename"
+
+
+class FakeConnection:
+    """Answers IRN queries after a fixed delay, like a responsive receiver."""
+
+    def __init__(self, names: dict, reply_delay: float, silent: set, drop_once: set = ()):
+        self.names = names
+        self.reply_delay = reply_delay
+        self.silent = silent
+        self.drop_once = set(drop_once)
+        self.sent = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.closed = False
+        self.protocol = self
+        self.transport = None
+
+    async def create(self, host, port, connect_callback, update_callback, **kwargs):
+        self.host = host
+        self.connect_callback = connect_callback
+        self.update_callback = update_callback
+        return self
+
+    async def connect(self):
+        self.transport = self
+        asyncio.get_running_loop().call_soon(self.connect_callback, self.host)
+
+    def write(self, data: bytes):
+        message = eISCPPacket.parse(data).strip()
+        message = message[2:] if message.startswith("!1") else message
+        self.sent.append(message)
+        input_id = message[3:]
+        if message[:3] != "IRN" or input_id in self.silent:
+            return
+        if input_id in self.drop_once:
+            self.drop_once.discard(input_id)
+            return
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        reply = ("main", IRN_COMMAND, f"{input_id}{self.names.get(input_id, '')}")
+        asyncio.get_running_loop().call_later(self.reply_delay, self.reply, reply)
+
+    def reply(self, reply):
+        self.in_flight -= 1
+        self.update_callback(reply, self.host)
+
+    def close(self):
+        self.closed = True
+        self.transport = None
+
+
+async def run_query(fake: FakeConnection, timeout: int = 5, **kwargs):
+    with patch.object(receiver.pyeiscp.Connection, "create", fake.create):
+        start = time.monotonic()
+        names = await async_query_custom_input_names(
+            "192.0.2.1", timeout=timeout, **kwargs
+        )
+        return names, time.monotonic() - start
+
+
+def test_returns_when_all_inputs_answered():
+    """All inputs answer within 20 ms, so the query must not wait for the timeout."""
+    fake = FakeConnection({"00": "Apple TV", "10": "Blu-ray"}, 0.02, set())
+    names, elapsed = asyncio.run(run_query(fake))
+
+    assert names == {"00": "Apple TV", "10": "Blu-ray"}
+    assert sorted(fake.sent) == sorted(f"IRN{i}" for i in IRN_QUERY_INPUT_IDS)
+    assert fake.closed
+    assert elapsed < 0.5, f"query took {elapsed:.2f}s"
+
+
+def test_unanswered_input_does_not_cost_full_timeout():
+    """An input that never answers is given up on after a few round trips."""
+    fake = FakeConnection({"00": "Apple TV"}, 0.02, {"26"})
+    names, elapsed = asyncio.run(run_query(fake))
+
+    assert names == {"00": "Apple TV"}
+    assert fake.sent.count("IRN26") == IRN_QUERY_ATTEMPTS
+    assert elapsed < 1.0, f"query took {elapsed:.2f}s"
+
+
+def test_retries_only_missing_inputs():
+    """A lost query is resent, the answered ones are not."""
+    fake = FakeConnection({"03": "Switch"}, 0.02, set(), drop_once={"03"})
+    names, elapsed = asyncio.run(run_query(fake))
+
+    assert names == {"03": "Switch"}
+    assert fake.sent.count("IRN03") == 2
+    assert len(fake.sent) == len(IRN_QUERY_INPUT_IDS) + 1
+
+
+def test_full_scan_is_pipelined():
+    """All input sources are scanned well under a second, within the window."""
+    input_ids = [input_source.value for input_source in InputSource]
+    fake = FakeConnection({"55": "Apple TV"}, 0.02, set())
+    names, elapsed = asyncio.run(run_query(fake, input_ids=input_ids))
+
+    assert names == {"55": "Apple TV"}
+    assert len(fake.sent) == len(input_ids)
+    assert fake.max_in_flight <= IRN_QUERY_WINDOW
+    assert elapsed < 1.0, f"query took {elapsed:.2f}s"
+
+
+def test_silent_receiver_bounded_by_timeout():
+    """A receiver that never answers costs at most the timeout."""
+    fake = FakeConnection({}, 0.02, set(IRN_QUERY_INPUT_IDS))
+    names, elapsed = asyncio.run(run_query(fake, timeout=1))
+
+    assert names == {}
+    assert elapsed < 1.5, f"query took {elapsed:.2f}s"
+
+
+if __name__ == "__main__":
+    for test in (
+        test_returns_when_all_inputs_answered,
+        test_unanswered_input_does_not_cost_full_timeout,
+        test_retries_only_missing_inputs,
+        test_full_scan_is_pipelined,
+        test_silent_receiver_bounded_by_timeout,
+    ):
+        test()
+        print(f"{test.__name__}: ok")
@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+"""
+Tests for the receiver's heartbeat, reconnecting and refreshing its
+information, on a virtual clock.
+
+Run with pytest, or directly: python test_receiver_connection.py
+"""
+
+import asyncio
+from unittest.mock import patch
+
+from custom_components.onkyo_ng import receiver as receiver_module
+from custom_components.onkyo_ng.receiver import (
+    HEARTBEAT_MISSED_BEATS,
+    HEARTBEAT_RETRY_INTERVAL,
+    HEARTBEAT_TIMEOUT,
+    RECONNECT_TIMEOUT,
+    ReceiverInfo,
+)
+from test_command_scheduler import make_receiver, run
+
+
+def test_dead_connection_detected_soon_after_first_miss():
+    """After a missed heartbeat, the next one follows soon, not an interval later."""
+
+    async def scenario():
+        loop = asyncio.get_running_loop()
+        receiver = make_receiver()
+        receiver.heartbeat_interval = 30
+        conn = receiver.conn
+        aborted = []
+
+        def query_property(zone, propname):
+            # The link dies silently after the first heartbeat.
+            if loop.time() < 31:
+                loop.call_later(
+                    0.02, receiver.on_update, ("main", "system-power", "on")
+                )
+
+        def abort():
+            aborted.append(loop.time())
+            conn.transport = None
+
+        conn.query_property = query_property
+        conn.abort = abort
+        heartbeat = loop.create_task(receiver._async_heartbeat())
+        await asyncio.sleep(120)
+        heartbeat.cancel()
+        return aborted, receiver.heartbeat_rtt
+
+    aborted, rtt = run(scenario())
+    assert abs(rtt - 0.02) < 1e-6
+    # Answered at 30.02, the next heartbeat at 60.02 is the first missed one.
+    expected = (
+        60.02
+        + HEARTBEAT_MISSED_BEATS * HEARTBEAT_TIMEOUT
+        + (HEARTBEAT_MISSED_BEATS - 1) * HEARTBEAT_RETRY_INTERVAL
+    )
+    assert len(aborted) == 1
+    assert abs(aborted[0] - expected) < 1e-6, aborted
+
+
+def test_reconnect_attempt_to_silent_host_times_out():
+    """A host that never answers the connection attempt does not stall reconnecting."""
+
+    async def scenario():
+        loop = asyncio.get_running_loop()
+        receiver = make_receiver()
+        receiver.conn.transport = None
+        receiver.conn.host, receiver.conn.port = "192.0.2.1", 60128
+        attempts = []
+
+        async def create_connection(protocol_factory, host, port):
+            attempts.append(loop.time())
+            await loop.create_future()
+
+        loop.create_connection = create_connection
+        receiver.started = True
+        receiver._start_reconnect()
+        await asyncio.sleep(3 * RECONNECT_TIMEOUT)
+        receiver.close()
+        return attempts
+
+    attempts = run(scenario())
+    assert len(attempts) >= 2
+    assert attempts[1] - attempts[0] >= RECONNECT_TIMEOUT
+
+
+async def discover_host(host):
+    return ReceiverInfo(host, 60128, "TX-NR609", "0009B0000000")
+
+
+def test_refresh_info_skipped_while_disconnected():
+    """Without a connection, the receiver is not interviewed again."""
+
+    async def scenario():
+        receiver = make_receiver()
+        receiver.conn.transport = None
+        with patch.object(receiver_module, "_async_discover_host") as discover:
+            info = await receiver.async_refresh_info()
+        return info, discover.called
+
+    assert run(scenario()) == (None, False)
+
+
+def test_refresh_info_survives_connection_lost_during_scan():
+    """The link dropping during the input name scan ends the refresh quietly."""
+
+    async def scenario():
+        receiver = make_receiver()
+        conn = receiver.conn
+        writes = []
+
+        class Transport:
+            def write(self, data):
+                writes.append(data)
+                if len(writes) == 2:
+                    conn.transport = None
+
+        conn.transport = Transport()
+        before = receiver.info
+        with patch.object(receiver_module, "_async_discover_host", discover_host):
+            info = await receiver.async_refresh_info()
+        return info, receiver.info is before, len(writes)
+
+    info, info_kept, writes = run(scenario())
+    assert info is None
+    assert info_kept
+    assert writes == 2
+
+
+if __name__ == "__main__":
+    for test in (
+        test_dead_connection_detected_soon_after_first_miss,
+        test_reconnect_attempt_to_silent_host_times_out,
+        test_refresh_info_skipped_while_disconnected,
+        test_refresh_info_survives_connection_lost_during_scan,
+    ):
+        test()
+        print(f"{test.__name__}: ok")